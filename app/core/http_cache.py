@@ -0,0 +1,75 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+from fastapi import Request, Response
+from app.core.negotiation import response_format
+
+# Clients may store responses but must revalidate them; a 304 costs one
+# cheap validator query instead of loading and serializing the payload
+PUBLIC_CACHE_CONTROL = "no-cache"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+def weak_etag(*parts: Any) -> str:
+    """Weak ETag from the version columns / timestamps that determine a response.
+
+    Each representation (JSON, MessagePack) gets its own tag, so a client
+    or cache never revalidates one format against the other.
+    """
+    fmt = response_format.get()
+    if fmt != "json":
+        parts += (fmt,)
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+def latest(*stamps: Optional[datetime]) -> Optional[datetime]:
+    present = [stamp for stamp in stamps if stamp is not None]
+    return max(present) if present else None
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison: W/"x" matches "x"
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+def _not_modified_since(header: str, modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole-second precision
+    return modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    modified: Optional[datetime] = None,
+    private: bool = False,
+) -> Optional[Response]:
+    """Set the validators on ``response`` and return a 304 if the client's copy is current.
+
+    ``modified`` is a naive UTC datetime, as stored in the models. Pass it for
+    single resources only: deleting a row from a collection does not move its
+    max(updated_at), so If-Modified-Since would miss the deletion. Collections
+    are validated by ETag alone (their tags include the row count).
+    If-None-Match takes precedence over If-Modified-Since, as RFC 9110 requires.
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": PRIVATE_CACHE_CONTROL if private else PUBLIC_CACHE_CONTROL,
+    }
+    if modified is not None:
+        headers["Last-Modified"] = format_datetime(modified.replace(tzinfo=timezone.utc), usegmt=True)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        fresh = bool(if_modified_since and modified and _not_modified_since(if_modified_since, modified))
+    return Response(status_code=304, headers=headers) if fresh else None
@@ -0,0 +1,152 @@
+import json
+from contextvars import ContextVar
+from typing import Any
+import anyio.to_thread
+import msgpack
+from fastapi import Request, Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    # Private and marked temporary upstream: fastapi is pinned in requirements.txt
+    # and tests/test_negotiation.py fails if NegotiatedRoute stops packing models
+    from fastapi.routing import _effective_route_context_var
+except ImportError:  # included routes then fall back to MessagePackMiddleware transcoding
+    _effective_route_context_var = None
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+# Transcoding JSON bodies above this size runs in a worker thread, as compression does
+TRANSCODE_THREAD_MINIMUM_SIZE = 128 * 1024
+_transcode_limiter = anyio.CapacityLimiter(8)
+
+# The representation negotiated for the current request: "json" or "msgpack"
+response_format: ContextVar[str] = ContextVar("response_format", default="json")
+
+def _qualities(accept: str) -> dict[str, float]:
+    qualities = {}
+    for part in accept.split(","):
+        media_type, *params = (piece.strip() for piece in part.split(";"))
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if media_type:
+            qualities[media_type.lower()] = q
+    return qualities
+
+def negotiate(accept: str) -> str:
+    """"msgpack" only when the client asks for it at least as strongly as for JSON"""
+    qualities = _qualities(accept)
+    msgpack_q = max((qualities.get(media_type, 0.0) for media_type in _MSGPACK_MEDIA_TYPES), default=0.0)
+    if msgpack_q <= 0:
+        return "json"
+    json_q = qualities.get("application/json", qualities.get("application/*", qualities.get("*/*", 0.0)))
+    return "msgpack" if msgpack_q >= json_q else "json"
+
+class MessagePackResponse(Response):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content)
+
+class NegotiatedRoute(APIRoute):
+    """Route class that packs response models straight into MessagePack when negotiated.
+
+    Routes with a response model get a second handler: the validated value
+    is dumped in JSON mode (the same structure as the JSON body) and packed,
+    with no JSON text in between. JSON requests keep FastAPI's default path,
+    which writes the JSON bytes directly.
+    """
+
+    def get_route_handler(self):
+        json_handler = super().get_route_handler()
+        # Included routers build handlers from an inclusion context, not the route itself
+        context = _effective_route_context_var.get() if _effective_route_context_var is not None else None
+        route = context if context is not None and context.original_route is self else self
+        if route.response_field is None or not isinstance(route.response_class, DefaultPlaceholder):
+            return json_handler
+        response_class = route.response_class
+        route.response_class = MessagePackResponse
+        try:
+            msgpack_handler = super().get_route_handler()
+        finally:
+            route.response_class = response_class
+
+        async def handler(request: Request) -> Response:
+            if response_format.get() == "msgpack":
+                return await msgpack_handler(request)
+            return await json_handler(request)
+
+        return handler
+
+def _transcode(body: bytes) -> bytes:
+    return msgpack.packb(json.loads(body))
+
+class MessagePackMiddleware:
+    """Negotiate MessagePack for clients that Accept it, JSON otherwise.
+
+    Sets ``response_format`` for NegotiatedRoute and weak_etag (each format
+    has its own ETag). JSON bodies that no response model produced (errors,
+    prebuilt course documents, plain dicts) are transcoded here, in a worker
+    thread when large. Every negotiable response gets ``Vary: Accept`` so
+    shared caches keep the two representations apart.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        fmt = negotiate(Headers(scope=scope).get("accept", ""))
+        token = response_format.set(fmt)
+        try:
+            await self.app(scope, receive, _Transcoder(send, fmt == "msgpack").send)
+        finally:
+            response_format.reset(token)
+
+class _Transcoder:
+    def __init__(self, send: Send, to_msgpack: bool):
+        self._send = send
+        self._to_msgpack = to_msgpack
+        self._start: Message = {}
+        self._json = False
+        self._chunks: list[bytes] = []
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(raw=message["headers"])
+            media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+            self._json = self._to_msgpack and media_type == "application/json"
+            if media_type in ("application/json", MSGPACK_MEDIA_TYPE) or message["status"] == 304:
+                headers.add_vary_header("Accept")
+            if not self._json:
+                await self._send(message)
+                return
+            self._start = message
+            return
+        if message["type"] != "http.response.body" or not self._json:
+            await self._send(message)
+            return
+        # Pack once the whole JSON body has arrived
+        self._chunks.append(message.get("body", b""))
+        if message.get("more_body", False):
+            return
+        body = b"".join(self._chunks)
+        if len(body) >= TRANSCODE_THREAD_MINIMUM_SIZE:
+            packed = await anyio.to_thread.run_sync(_transcode, body, limiter=_transcode_limiter)
+        else:
+            packed = _transcode(body) if body else body
+        headers = MutableHeaders(raw=self._start["headers"])
+        headers["content-type"] = MSGPACK_MEDIA_TYPE
+        headers["content-length"] = str(len(packed))
+        await self._send(self._start)
+        await self._send({"type": "http.response.body", "body": packed, "more_body": False})
@@ -0,0 +1,38 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Sequence
+from fastapi import HTTPException, Request, Response
+
+# List bodies stay plain arrays; the next page is advertised in headers
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque cursor for the (sort key..., id) of the last row on a page"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    """Decode a cursor from encode_cursor into values of ``types`` (400 if malformed)"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError
+        return tuple(
+            datetime.fromisoformat(value) if kind is datetime else kind(value)
+            for kind, value in zip(types, values)
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def set_next_cursor(
+    request: Request, response: Response, rows: Sequence, limit: int, key: Callable[[Any], tuple]
+) -> None:
+    """When the page is full, send X-Next-Cursor and a Link: rel="next" header"""
+    if not rows or len(rows) < limit:
+        return
+    cursor = encode_cursor(*key(rows[-1]))
+    response.headers[NEXT_CURSOR_HEADER] = cursor
+    next_url = request.url.remove_query_params("skip").include_query_params(cursor=cursor)
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
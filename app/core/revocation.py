@@ -0,0 +1,130 @@
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import bindparam, delete
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+PURGE_EXPIRED = delete(RevokedToken).where(RevokedToken.expires_at < bindparam("now"))
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no false negatives)"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+class TokenRevocationList:
+    """Server-side revocation of access tokens by ``jti``.
+
+    Revocations are stored in the ``revoked_token`` table and mirrored in a
+    per-worker Bloom filter, so the common "not revoked" answer costs no
+    database round trip. Only Bloom hits are confirmed against the table.
+    Each worker pulls revocations made by other workers at most once every
+    ``sync_seconds``. Rows of expired tokens are deleted by
+    ``purge_expired_revocations``, outside the request path.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, sync_seconds: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_seconds = sync_seconds
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._watermark: Optional[datetime] = None
+        # jtis already in the filter whose rows fall in the sync overlap window
+        self._recent: dict[str, datetime] = {}
+        self._last_sync = 0.0
+        self._lock = threading.Lock()
+
+    def _sync(self, db: Session) -> None:
+        if time.monotonic() - self._last_sync < self.sync_seconds:
+            return
+        if not self._lock.acquire(blocking=False):
+            return  # Another thread is already syncing
+        try:
+            now = datetime.utcnow()
+            query = db.query(RevokedToken.jti, RevokedToken.revoked_at)
+            rebuild = self._watermark is None or self._bloom.count >= self.capacity
+            if rebuild:
+                # (Re)build from the rows of tokens that have not expired yet
+                bloom = BloomFilter(self.capacity, self.error_rate)
+                rows = query.filter(RevokedToken.expires_at >= now).all()
+                recent = {}
+            else:
+                # Overlap the window so rows committed slightly out of order are not missed
+                since = self._watermark - timedelta(seconds=self.sync_seconds)
+                bloom = self._bloom
+                rows = query.filter(RevokedToken.revoked_at >= since).all()
+                recent = {jti: at for jti, at in self._recent.items() if at >= since}
+            for jti, revoked_at in rows:
+                # Rows seen by the previous sync come back in the overlap; ``recent`` only
+                # keeps them from being counted twice, a new filter gets every row
+                if rebuild or jti not in recent:
+                    bloom.add(jti)
+                recent[jti] = revoked_at
+                if self._watermark is None or revoked_at > self._watermark:
+                    self._watermark = revoked_at
+            if self._watermark is None:
+                self._watermark = now
+            self._bloom = bloom
+            self._recent = recent
+            self._last_sync = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def is_revoked(self, db: Session, jti: str) -> bool:
+        self._sync(db)
+        if jti not in self._bloom:
+            return False
+        return db.get(RevokedToken, jti) is not None
+
+    def revoke(self, db: Session, jti: str, user_id: int, expires_at: datetime) -> None:
+        db.merge(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+        db.commit()
+        # Waits out a running sync, so the jti lands in the filter that sync installs
+        with self._lock:
+            self._bloom.add(jti)
+            self._recent[jti] = datetime.utcnow()
+
+revocation_list = TokenRevocationList(
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+    sync_seconds=settings.REVOCATION_SYNC_SECONDS,
+)
+
+async def purge_expired_revocations(interval: float = 3600) -> None:
+    """Delete rows of tokens that have expired anyway, now and then every ``interval`` seconds"""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(PURGE_EXPIRED, {"now": datetime.utcnow()})
+                await db.commit()
+        except Exception:
+            logger.exception("Purging expired token revocations failed")
+        await asyncio.sleep(interval)
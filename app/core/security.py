@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import hashlib
+import time
+import uuid
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional, TYPE_CHECKING
 import jwt
@@ -7,15 +11,71 @@ from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
+from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.core.cache import TTLCache
+from app.core.revocation import revocation_list
+from app.db.database import get_db
 
 if TYPE_CHECKING:
     from app.models.models import User
 
 # Use argon2 for password hashing
-ph = PasswordHasher()
+ph = PasswordHasher(
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_COST,
+    parallelism=settings.ARGON2_PARALLELISM,
+)
 security = HTTPBearer()
 
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Immutable snapshot of the fields needed to authenticate and authorize a user"""
+    id: int
+    is_active: bool
+    is_admin: bool
+    is_instructor: bool
+    name: str
+    email: str
+
+    @classmethod
+    def from_user(cls, user: "User") -> "Principal":
+        return cls(
+            id=user.id,
+            is_active=bool(user.is_active),
+            is_admin=bool(user.is_admin),
+            is_instructor=bool(user.is_instructor),
+            name=user.name,
+            email=user.email,
+        )
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> Optional["Principal"]:
+        """Build a principal from token claims; None for tokens issued without them"""
+        roles = payload.get("roles")
+        if roles is None:
+            return None
+        return cls(
+            id=int(payload["sub"]),
+            is_active=bool(payload.get("active", True)),
+            is_admin="admin" in roles,
+            is_instructor="instructor" in roles,
+            name=payload.get("name", ""),
+            email=payload.get("email", ""),
+        )
+
+# Principals are snapshots. Claims last as long as their token; cached
+# principals (only used for tokens issued without claims) last the TTL.
+# Nothing invalidates either: profile edits may show up late, and no route
+# changes roles or is_active. One that does must revoke the user's tokens.
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+# Verified token payloads keyed by token digest; entries expire with the token
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_MAXSIZE, ttl=0)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     try:
         ph.verify(hashed_password, plain_password)
@@ -26,10 +86,32 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return ph.hash(password)
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with parameters other than the configured ones"""
+    return ph.check_needs_rehash(hashed_password)
+
 def hash_password(password: str) -> str:
     """Alias for get_password_hash"""
     return get_password_hash(password)
 
+def token_claims(user: "User") -> dict:
+    """Claims embedded in access tokens so routes can authorize without a user lookup.
+
+    Role changes take effect when the token is refreshed or expires.
+    """
+    roles = []
+    if user.is_admin:
+        roles.append("admin")
+    if user.is_instructor:
+        roles.append("instructor")
+    return {
+        "sub": str(user.id),
+        "name": user.name,
+        "email": user.email,
+        "roles": roles,
+        "active": bool(user.is_active),
+    }
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -37,51 +119,103 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     to_encode.update({"exp": expire})
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 def decode_token(token: str) -> Optional[dict]:
+    """Verify a token, reusing the payload of tokens that were already verified"""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except jwt.InvalidTokenError:
         return None
+    remaining = payload.get("exp", 0) - time.time()
+    if remaining > 0:
+        token_cache.set(key, payload, ttl=remaining)
+    return payload
 
-def get_current_user(credentials = Depends(security)):
-    """Get the current user from JWT token"""
-    token = credentials.credentials
-    payload = decode_token(token)
-    if payload is None:
+def get_token_payload(credentials = Depends(security), db: Session = Depends(get_db)) -> dict:
+    """Decode the bearer token, make sure it names a user and has not been revoked"""
+    payload = decode_token(credentials.credentials)
+    if payload is None or payload.get("sub") is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user_id = payload.get("sub")
-    if user_id is None:
+    jti = payload.get("jti")
+    if jti is not None and revocation_list.is_revoked(db, jti):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
+            detail="Token has been revoked",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return payload
+
+def revoke_token(db: Session, payload: dict) -> None:
+    """Revoke the token a payload was decoded from (tokens without a jti cannot be revoked)"""
+    jti = payload.get("jti")
+    if jti is None:
+        return
+    revocation_list.revoke(
+        db,
+        jti=jti,
+        user_id=int(payload["sub"]),
+        expires_at=datetime.utcfromtimestamp(payload["exp"]),
+    )
+
+def user_not_found() -> HTTPException:
+    """401 for a token whose user no longer exists (claims outlive the user row)"""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="User not found",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def get_current_user(payload: dict = Depends(get_token_payload), db: Session = Depends(get_db)):
+    """Get the current user from JWT token, attached to the request's session"""
+    user_id = int(payload["sub"])
     
     # Import here to avoid circular imports
-    from app.db.database import get_db
     from app.models.models import User
     
-    db = next(get_db())
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    db.close()
+    user = db.get(User, user_id)
     
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise user_not_found()
+    principal_cache.set(user.id, Principal.from_user(user))
     return user
 
-def get_current_admin(current_user: "User" = Depends(get_current_user)):
+def get_current_principal(payload: dict = Depends(get_token_payload), db: Session = Depends(get_db)) -> Principal:
+    """Get the current user's principal from token claims.
+
+    Tokens issued before claims were added fall back to the principal cache
+    and, on a miss, the database.
+    """
+    principal = Principal.from_claims(payload)
+    if principal is not None:
+        return principal
+    
+    user_id = int(payload["sub"])
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    
+    from app.models.models import User
+    
+    user = db.get(User, user_id)
+    
+    if user is None:
+        raise user_not_found()
+    principal = Principal.from_user(user)
+    principal_cache.set(user_id, principal)
+    return principal
+
+def get_current_admin(current_user: Principal = Depends(get_current_principal)):
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
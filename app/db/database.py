@@ -1,22 +1,82 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
+from app.db.pool_metrics import PoolMetrics
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+def _pool_options() -> dict:
+    return dict(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_use_lifo=settings.DB_POOL_USE_LIFO,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+def _async_url(url: str) -> str:
+    """Same database as ``url``, through the asyncpg driver"""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
 
 # Create engine - PostgreSQL connection
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,  # Enable connection pool pre-ping
-    echo=False  # Set to True for SQL debugging
+    poolclass=pool_metrics.instrumented_pool_class(QueuePool),
+    echo=False,  # Set to True for SQL debugging
+    **_pool_options()
 )
+pool_metrics.attach(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def _create_async_engine(url: str, metrics: PoolMetrics):
+    async_engine = create_async_engine(
+        _async_url(url),
+        poolclass=metrics.instrumented_pool_class(AsyncAdaptedQueuePool),
+        echo=False,
+        **_pool_options()
+    )
+    metrics.attach(async_engine.sync_engine)
+    return async_engine
+
+# Async engine (asyncpg) for async def routes; it has its own pool of the same size
+async_engine = _create_async_engine(settings.DATABASE_URL, async_pool_metrics)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Optional read replicas; app.db.routing sends read-only catalog queries here
+replica_pool_metrics = [PoolMetrics() for _ in settings.DATABASE_REPLICA_URLS]
+replica_engines = [
+    _create_async_engine(url, metrics)
+    for url, metrics in zip(settings.DATABASE_REPLICA_URLS, replica_pool_metrics)
+]
+ReplicaSessionLocals = [
+    async_sessionmaker(replica_engine, autoflush=False, expire_on_commit=False)
+    for replica_engine in replica_engines
+]
+
 class Base(DeclarativeBase):
     pass
 
 def get_db():
+    """Request-scoped session.
+
+    FastAPI caches dependencies per request, so the auth dependencies and the
+    route handler share this one session (and at most one pooled connection).
+    The session only checks out a connection on its first query.
+    """
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Request-scoped AsyncSession for async def routes"""
+    async with AsyncSessionLocal() as db:
+        yield db
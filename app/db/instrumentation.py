@@ -0,0 +1,84 @@
+import contextvars
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"IN \([^)]*\)", re.IGNORECASE)
+
+class QueryStats:
+    """Statements executed while collecting, with total database time"""
+    __slots__ = ("count", "duration", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+
+    def repeated_shapes(self, threshold: int) -> dict:
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+_current_stats: contextvars.ContextVar = contextvars.ContextVar("query_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Connections checked out before instrument_engines() ran have no start time
+    started = conn.info.get("query_start_time")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, statement)
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += elapsed
+        # Statements are already parameterized; only expanded IN lists vary in shape
+        stats.shapes[_IN_LIST.sub("IN (...)", statement)] += 1
+
+def instrument_engines() -> None:
+    """Time every statement on every engine (sync, async and replicas)"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+@contextmanager
+def count_queries():
+    """Collect QueryStats for the statements run inside the block (enclosing blocks count them too)"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        outer = _current_stats.get()
+        if outer is not None:
+            outer.count += stats.count
+            outer.duration += stats.duration
+            outer.shapes.update(stats.shapes)
+
+async def query_metrics_middleware(request: Request, call_next):
+    """Count statements per request, flag N+1 patterns and report DB time in Server-Timing"""
+    start = time.perf_counter()
+    with count_queries() as stats:
+        response = await call_next(request)
+    total = time.perf_counter() - start
+
+    repeated = stats.repeated_shapes(settings.N_PLUS_ONE_THRESHOLD)
+    for shape, n in repeated.items():
+        logger.warning("Possible N+1 on %s %s: %d x %s", request.method, request.url.path, n, shape)
+
+    response.headers.append(
+        "Server-Timing",
+        f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", app;dur={total * 1000:.1f}',
+    )
+    return response
@@ -0,0 +1,6 @@
+"""Create any model tables missing from a database that predates migrations"""
+from app.db.database import Base
+
+def upgrade(ctx):
+    # checkfirst leaves existing tables alone; later migrations bring them up to date
+    Base.metadata.create_all(ctx.connection, checkfirst=True)
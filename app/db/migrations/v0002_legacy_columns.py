@@ -0,0 +1,6 @@
+"""Columns previously added by migrate_admin.py and migrate_order.py"""
+
+def upgrade(ctx):
+    ctx.execute('ALTER TABLE "user" ADD COLUMN IF NOT EXISTS is_admin BOOLEAN DEFAULT FALSE')
+    ctx.execute('ALTER TABLE "order" ADD COLUMN IF NOT EXISTS payment_proof VARCHAR')
+    ctx.execute('ALTER TABLE "order" ADD COLUMN IF NOT EXISTS transaction_id VARCHAR')
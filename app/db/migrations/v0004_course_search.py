@@ -0,0 +1,14 @@
+"""Generated, weighted tsvector on course with a GIN index for full-text search"""
+from app.models.models import COURSE_SEARCH_VECTOR
+
+transactional = False
+
+def upgrade(ctx):
+    if not ctx.column_exists("course", "search_vector"):
+        # Adding a stored generated column rewrites the table once; the course
+        # catalog is small, so the exclusive lock is brief.
+        ctx.execute(
+            f"ALTER TABLE course ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({COURSE_SEARCH_VECTOR}) STORED"
+        )
+    ctx.create_index("ix_course_search_vector", "course", "search_vector", using="gin")
@@ -0,0 +1,12 @@
+"""(sort key, id) indexes for keyset pagination of category pages, reviews and orders"""
+
+transactional = False
+
+def upgrade(ctx):
+    ctx.create_index("ix_course_category_id", "course", "category, id")
+    ctx.create_index("ix_review_course_id_created_at_id", "review", "course_id, created_at, id")
+    ctx.create_index("ix_order_user_id_created_at_id", "order", "user_id, created_at, id")
+    # Superseded by the wider indexes above
+    ctx.drop_index("ix_course_category")
+    ctx.drop_index("ix_review_course_id_created_at")
+    ctx.drop_index("ix_order_user_id_created_at")
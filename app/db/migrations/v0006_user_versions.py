@@ -0,0 +1,6 @@
+"""Per-user cart and wishlist versions for conditional GETs"""
+
+def upgrade(ctx):
+    # A constant default is stored in the catalog, so this does not rewrite the table
+    ctx.execute('ALTER TABLE "user" ADD COLUMN IF NOT EXISTS cart_version INTEGER NOT NULL DEFAULT 0')
+    ctx.execute('ALTER TABLE "user" ADD COLUMN IF NOT EXISTS wishlist_version INTEGER NOT NULL DEFAULT 0')
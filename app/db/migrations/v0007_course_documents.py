@@ -0,0 +1,6 @@
+"""Table of prebuilt course detail documents"""
+from app.models.models import CourseDocument
+
+def upgrade(ctx):
+    # Starts empty; documents are built on first read
+    CourseDocument.__table__.create(ctx.connection, checkfirst=True)
@@ -0,0 +1,10 @@
+"""Tombstones and updated_at indexes for delta sync"""
+from app.models.models import SyncTombstone
+
+transactional = False
+
+def upgrade(ctx):
+    # Starts empty: deletions before this migration are only seen by a full sync
+    SyncTombstone.__table__.create(ctx.connection, checkfirst=True)
+    ctx.create_index("ix_course_updated_at", "course", "updated_at")
+    ctx.create_index("ix_daily_class_updated_at", "daily_class", "updated_at")
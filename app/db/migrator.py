@@ -0,0 +1,232 @@
+import importlib
+import logging
+import pkgutil
+import re
+import time
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Optional
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from app.db import migrations
+from app.db.database import Base
+import app.models.models  # noqa: F401  (registers the tables on Base.metadata)
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_TABLE = "schema_migrations"
+# pg_advisory_lock key shared by every deploy of this app
+ADVISORY_LOCK_KEY = 7_201_204_101
+_MODULE_NAME = re.compile(r"^v(\d{4})_(\w+)$")
+
+@dataclass(frozen=True)
+class Migration:
+    """One ``app/db/migrations/vNNNN_name.py`` module.
+
+    The module defines ``upgrade(ctx)`` and may set ``transactional = False``
+    for steps that cannot run inside a transaction (CREATE INDEX CONCURRENTLY).
+    """
+    version: int
+    name: str
+    module: ModuleType
+
+    @property
+    def transactional(self) -> bool:
+        return getattr(self.module, "transactional", True)
+
+    @property
+    def description(self) -> str:
+        return (self.module.__doc__ or self.name).strip().splitlines()[0]
+
+def discover() -> list[Migration]:
+    """All migrations in version order"""
+    found = []
+    for info in pkgutil.iter_modules(migrations.__path__):
+        match = _MODULE_NAME.match(info.name)
+        if match:
+            module = importlib.import_module(f"{migrations.__name__}.{info.name}")
+            found.append(Migration(int(match.group(1)), match.group(2), module))
+    found.sort(key=lambda m: m.version)
+    versions = [m.version for m in found]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions in {migrations.__name__}")
+    return found
+
+class MigrationContext:
+    """Passed to ``upgrade(ctx)``.
+
+    A transactional migration runs in one transaction that also records its
+    version. A non-transactional one runs each statement in autocommit mode,
+    so every step has to be safe to re-run after a failure part-way through;
+    the helpers below are.
+    """
+
+    def __init__(self, connection: Connection, transactional: bool, batch_pause: float = 0.0):
+        self.connection = connection
+        self.transactional = transactional
+        self.batch_pause = batch_pause
+
+    def execute(self, sql: str, **params):
+        return self.connection.execute(text(sql), params)
+
+    def _require_autocommit(self, operation: str) -> None:
+        if self.transactional:
+            raise RuntimeError(f"{operation} needs a migration with transactional = False")
+
+    def index_exists(self, name: str, valid_only: bool = True) -> bool:
+        row = self.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)", name=name).first()
+        return row is not None and (row[0] or not valid_only)
+
+    def constraint_exists(self, table: str, name: str) -> bool:
+        return self.execute(
+            "SELECT 1 FROM pg_constraint WHERE conrelid = to_regclass(:table) AND conname = :name",
+            table=f'"{table}"', name=name,
+        ).first() is not None
+
+    def column_exists(self, table: str, column: str) -> bool:
+        return column in {c["name"] for c in inspect(self.connection).get_columns(table)}
+
+    def create_index(
+        self, name: str, table: str, columns: str,
+        unique: bool = False, where: Optional[str] = None, using: Optional[str] = None,
+    ) -> None:
+        """CREATE INDEX CONCURRENTLY, replacing an invalid index left by a failed earlier build"""
+        self._require_autocommit("create_index")
+        if self.index_exists(name):
+            return
+        if self.index_exists(name, valid_only=False):
+            self.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+        sql = f'CREATE {"UNIQUE " if unique else ""}INDEX CONCURRENTLY "{name}" ON "{table}"'
+        if using:
+            sql += f" USING {using}"
+        sql += f" ({columns})"
+        if where:
+            sql += f" WHERE {where}"
+        logger.info("  creating index %s", name)
+        self.execute(sql)
+
+    def drop_index(self, name: str) -> None:
+        self._require_autocommit("drop_index")
+        self.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+    def add_constraint(self, table: str, name: str, definition: str) -> None:
+        """Add a CHECK or FOREIGN KEY constraint as NOT VALID, then VALIDATE it.
+
+        Adding takes only a brief exclusive lock; validation scans the table
+        while reads and writes continue.
+        """
+        self._require_autocommit("add_constraint")
+        if not self.constraint_exists(table, name):
+            self.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition} NOT VALID')
+        logger.info("  validating constraint %s", name)
+        self.execute(f'ALTER TABLE "{table}" VALIDATE CONSTRAINT "{name}"')
+
+    def set_not_null(self, table: str, column: str) -> None:
+        """SET NOT NULL backed by a validated CHECK, so PostgreSQL skips the locked full scan"""
+        if not any(c["name"] == column and c["nullable"] for c in inspect(self.connection).get_columns(table)):
+            return
+        check = f"{table}_{column}_not_null"
+        self.add_constraint(table, check, f'CHECK ("{column}" IS NOT NULL)')
+        self.execute(f'ALTER TABLE "{table}" ALTER COLUMN "{column}" SET NOT NULL')
+        self.execute(f'ALTER TABLE "{table}" DROP CONSTRAINT IF EXISTS "{check}"')
+
+    def add_constraint_using_index(self, table: str, name: str, kind: str, columns: str) -> None:
+        """Build a unique index concurrently and attach it as a PRIMARY KEY or UNIQUE constraint"""
+        if self.constraint_exists(table, name):
+            return
+        self.create_index(name, table, columns, unique=True)
+        self.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {kind} USING INDEX "{name}"')
+
+    def batched(self, sql: str, batch_size: int = 5000, **params) -> int:
+        """Run a bounded UPDATE/DELETE until it touches fewer than ``batch_size`` rows.
+
+        ``sql`` limits itself with ``:batch_size`` (usually in a subquery) and
+        each batch commits on its own, keeping row locks short.
+        """
+        self._require_autocommit("batched")
+        total = 0
+        while True:
+            affected = self.execute(sql, batch_size=batch_size, **params).rowcount
+            total += affected
+            if affected < batch_size:
+                return total
+            if self.batch_pause:
+                time.sleep(self.batch_pause)
+
+def _ensure_table(connection: Connection) -> None:
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+        "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at TIMESTAMP NOT NULL DEFAULT now())"
+    ))
+
+def _applied(connection: Connection) -> dict:
+    rows = connection.execute(text(f"SELECT version, applied_at FROM {MIGRATIONS_TABLE}"))
+    return {version: applied_at for version, applied_at in rows}
+
+def _record(connection: Connection, migration: Migration) -> None:
+    connection.execute(
+        text(f"INSERT INTO {MIGRATIONS_TABLE} (version, name) VALUES (:version, :name)"),
+        {"version": migration.version, "name": migration.name},
+    )
+
+def _set_lock_timeout(connection: Connection, lock_timeout_ms: int) -> None:
+    # Fail fast instead of queueing behind a long transaction (and blocking every query behind us)
+    connection.execute(text(f"SET lock_timeout = {int(lock_timeout_ms)}"))
+
+def _apply(engine: Engine, migration: Migration, lock_timeout_ms: int, batch_pause: float) -> None:
+    logger.info("Applying %04d_%s: %s", migration.version, migration.name, migration.description)
+    start = time.perf_counter()
+    if migration.transactional:
+        with engine.begin() as connection:
+            _set_lock_timeout(connection, lock_timeout_ms)
+            migration.module.upgrade(MigrationContext(connection, transactional=True))
+            _record(connection, migration)
+    else:
+        with engine.connect() as connection:
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+            _set_lock_timeout(connection, lock_timeout_ms)
+            migration.module.upgrade(MigrationContext(connection, transactional=False, batch_pause=batch_pause))
+            _record(connection, migration)
+    logger.info("Applied %04d_%s in %.1fs", migration.version, migration.name, time.perf_counter() - start)
+
+def status(engine: Engine) -> list[tuple[Migration, Optional[object]]]:
+    """(migration, applied_at or None) for every known migration (read-only)"""
+    with engine.connect() as connection:
+        applied = _applied(connection) if inspect(connection).has_table(MIGRATIONS_TABLE) else {}
+    return [(m, applied.get(m.version)) for m in discover()]
+
+def pending(engine: Engine) -> list[Migration]:
+    return [m for m, applied_at in status(engine) if applied_at is None]
+
+def upgrade(engine: Engine, target: Optional[int] = None, lock_timeout_ms: int = 5000, batch_pause: float = 0.0) -> list[Migration]:
+    """Apply pending migrations up to ``target`` and return the ones applied.
+
+    Runs under a session advisory lock, so concurrent deploys wait instead of
+    racing. An empty database is created from the models in one transaction
+    and stamped with every migration.
+    """
+    all_migrations = discover()
+    with engine.connect() as lock_connection:
+        lock_connection = lock_connection.execution_options(isolation_level="AUTOCOMMIT")
+        lock_connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        try:
+            _ensure_table(lock_connection)
+            applied = _applied(lock_connection)
+
+            if not applied and not inspect(lock_connection).has_table("user"):
+                with engine.begin() as connection:
+                    Base.metadata.create_all(connection)
+                    for migration in all_migrations:
+                        _record(connection, migration)
+                logger.info("Created schema at version %04d", all_migrations[-1].version if all_migrations else 0)
+                return all_migrations
+
+            todo = [
+                m for m in all_migrations
+                if m.version not in applied and (target is None or m.version <= target)
+            ]
+            for migration in todo:
+                _apply(engine, migration, lock_timeout_ms, batch_pause)
+            return todo
+        finally:
+            lock_connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
@@ -0,0 +1,77 @@
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool
+
+class PoolMetrics:
+    """Counters for one engine's connection pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_seconds_total += seconds
+            if seconds > self.wait_seconds_max:
+                self.wait_seconds_max = seconds
+
+    def instrumented_pool_class(self, base: type[Pool]) -> type[Pool]:
+        """Subclass ``base`` so the time spent waiting for a connection is recorded"""
+        metrics = self
+
+        def _do_get(pool):
+            start = time.perf_counter()
+            try:
+                return base._do_get(pool)
+            except exc.TimeoutError:
+                metrics.timeouts += 1
+                raise
+            finally:
+                metrics.record_wait(time.perf_counter() - start)
+
+        return type(f"Instrumented{base.__name__}", (base,), {"_do_get": _do_get})
+
+    def attach(self, engine) -> None:
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            self.connects += 1
+
+        @event.listens_for(engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            self.checkouts += 1
+
+        @event.listens_for(engine, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            self.checkins += 1
+
+        @event.listens_for(engine, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            self.invalidations += 1
+
+        @event.listens_for(engine, "soft_invalidate")
+        def on_soft_invalidate(dbapi_connection, connection_record, exception):
+            self.soft_invalidations += 1
+
+    def snapshot(self, pool: Pool) -> dict:
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow_in_use": max(0, pool.overflow()),
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "soft_invalidations": self.soft_invalidations,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.wait_seconds_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.wait_seconds_max * 1000, 3),
+        }
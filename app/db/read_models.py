@@ -0,0 +1,41 @@
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Iterable, Optional
+from app.models.models import Course
+
+@dataclass(frozen=True, slots=True)
+class CourseRow:
+    """A course as listings serialize it (the CourseResponse fields), read as plain columns.
+
+    Selecting COURSE_ROW_COLUMNS skips the identity map, attribute
+    instrumentation and the columns listings never send (language,
+    certificate, preview_video, last_updated, search_vector).
+    """
+    id: int
+    title: str
+    slug: str
+    description: Optional[str]
+    short_description: Optional[str]
+    thumbnail: Optional[str]
+    price: Optional[float]
+    original_price: Optional[float]
+    duration: Optional[str]
+    lecture_count: Optional[int]
+    level: Optional[str]
+    category: Optional[str]
+    instructor_id: Optional[int]
+    rating: Optional[float]
+    review_count: Optional[int]
+    enrolled_count: Optional[int]
+    is_bestseller: Optional[bool]
+    is_trending: Optional[bool]
+    is_new: Optional[bool]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+COURSE_ROW_COLUMNS = tuple(getattr(Course, field.name) for field in fields(CourseRow))
+_COURSE_ROW_WIDTH = len(COURSE_ROW_COLUMNS)
+
+def course_rows(rows: Iterable) -> list[CourseRow]:
+    """Rows selected with COURSE_ROW_COLUMNS first (extra trailing columns are ignored)"""
+    return [CourseRow(*row[:_COURSE_ROW_WIDTH]) for row in rows]
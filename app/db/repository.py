@@ -0,0 +1,190 @@
+from sqlalchemy import and_, bindparam, exists, func, literal_column, or_, select, true, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import aliased, selectinload
+from app.db.read_models import COURSE_ROW_COLUMNS
+from app.models.models import (
+    User, Course, Section, CartItem, DailyClass, Review, enrollment_association, wishlist_association
+)
+
+# Hot lookups, built once at import with bound parameters. Executing a
+# prebuilt statement skips constructing it on every request, and its cache
+# key is stable, so the compiled SQL is reused from the engine's cache.
+# They work with both Session and AsyncSession:
+#
+#     course = db.scalar(COURSE_BY_ID, {"course_id": course_id})
+#     course = await db.scalar(COURSE_BY_ID, {"course_id": course_id})
+
+# Everything CourseDetailResponse serializes, loaded up front (async sessions cannot lazy load)
+COURSE_DETAIL_OPTIONS = (
+    selectinload(Course.instructor),
+    selectinload(Course.sections).selectinload(Section.lectures),
+)
+
+COURSE_BY_ID = select(Course).where(Course.id == bindparam("course_id"))
+COURSE_BY_SLUG = select(Course).where(Course.slug == bindparam("slug"))
+COURSE_DETAIL_BY_ID = COURSE_BY_ID.options(*COURSE_DETAIL_OPTIONS)
+COURSE_DETAIL_BY_SLUG = COURSE_BY_SLUG.options(*COURSE_DETAIL_OPTIONS)
+COURSE_EXISTS_BY_SLUG = select(Course.id).where(Course.slug == bindparam("slug")).limit(1)
+# Existence check before inserting a row that references the course: the
+# lock keeps the course from being deleted until the insert commits
+COURSE_FOR_REFERENCE = (
+    select(Course.id).where(Course.id == bindparam("course_id")).with_for_update(read=True, key_share=True)
+)
+# Pages are ordered by id and serve both modes: offset (after_id=0, skip=n)
+# and keyset (after_id=<cursor>, skip=0), which costs the same at any depth.
+# Listings select only the columns they serialize; read them with course_rows()
+COURSES_PAGE = (
+    select(*COURSE_ROW_COLUMNS)
+    .where(Course.id > bindparam("after_id"))
+    .order_by(Course.id)
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+)
+COURSES_BY_CATEGORY = (
+    select(*COURSE_ROW_COLUMNS)
+    .where(Course.category == bindparam("category"), Course.id > bindparam("after_id"))
+    .order_by(Course.id)
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+)
+
+CART_ITEMS_BY_USER = select(CartItem).where(CartItem.user_id == bindparam("user_id"))
+CART_ITEMS_WITH_COURSE_BY_USER = CART_ITEMS_BY_USER.options(
+    selectinload(CartItem.course).selectinload(Course.instructor)
+)
+CART_ITEM_BY_USER_AND_COURSE = select(CartItem).where(
+    CartItem.user_id == bindparam("user_id"),
+    CartItem.course_id == bindparam("course_id"),
+)
+
+USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+
+WISHLIST_HAS_COURSE = select(exists().where(
+    wishlist_association.c.user_id == bindparam("user_id"),
+    wishlist_association.c.course_id == bindparam("course_id"),
+))
+
+# Validators for conditional GETs (app/core/http_cache.py): the timestamps and
+# versions a response is built from, read without loading the response itself
+# The count catches deletions, which leave max(updated_at) unchanged
+COURSES_VALIDATORS = select(func.max(Course.updated_at), func.count(Course.id))
+COURSES_BY_CATEGORY_VALIDATORS = COURSES_VALIDATORS.where(Course.category == bindparam("category"))
+DAILY_CLASSES_VALIDATORS = (
+    select(Course.updated_at, func.max(DailyClass.updated_at), func.count(DailyClass.id))
+    .outerjoin(DailyClass, and_(DailyClass.course_id == Course.id, DailyClass.is_active == true()))
+    .where(Course.id == bindparam("course_id"))
+    .group_by(Course.id)
+)
+
+_instructor = aliased(User)
+
+def _latest_course_change(link, link_course_id, link_user_id):
+    """Newest change to the courses (and their instructors) a user links to"""
+    return (
+        select(func.max(func.greatest(Course.updated_at, _instructor.updated_at)))
+        .select_from(link)
+        .join(Course, Course.id == link_course_id)
+        .outerjoin(_instructor, _instructor.id == Course.instructor_id)
+        .where(link_user_id == bindparam("user_id"))
+        .scalar_subquery()
+    )
+
+CART_VALIDATORS = select(
+    User.cart_version, _latest_course_change(CartItem, CartItem.course_id, CartItem.user_id)
+).where(User.id == bindparam("user_id"))
+WISHLIST_VALIDATORS = select(
+    User.wishlist_version,
+    _latest_course_change(wishlist_association, wishlist_association.c.course_id, wishlist_association.c.user_id),
+).where(User.id == bindparam("user_id"))
+
+# Run in the same transaction as the cart / wishlist change. updated_at is
+# pinned because it means "profile changed" and feeds the instructor validators.
+BUMP_CART_VERSION = (
+    update(User)
+    .where(User.id == bindparam("user_id"))
+    .values(cart_version=User.cart_version + 1, updated_at=User.updated_at)
+    .execution_options(synchronize_session=False)
+)
+BUMP_WISHLIST_VERSION = (
+    update(User)
+    .where(User.id == bindparam("user_id"))
+    .values(wishlist_version=User.wishlist_version + 1, updated_at=User.updated_at)
+    .execution_options(synchronize_session=False)
+)
+
+# One row per (user, course). Two identical requests can both pass a
+# "does it exist" check, so the insert itself skips duplicates: the loser
+# gets no RETURNING row (rowcount 0) instead of an IntegrityError.
+INSERT_CART_ITEM = (
+    insert(CartItem)
+    .values(user_id=bindparam("user_id"), course_id=bindparam("course_id"))
+    .on_conflict_do_nothing(index_elements=[CartItem.user_id, CartItem.course_id])
+    .returning(CartItem)
+)
+INSERT_WISHLIST = (
+    insert(wishlist_association)
+    .values(user_id=bindparam("user_id"), course_id=bindparam("course_id"))
+    .on_conflict_do_nothing()
+)
+INSERT_ENROLLMENT = (
+    insert(enrollment_association)
+    .values(user_id=bindparam("user_id"), course_id=bindparam("course_id"))
+    .on_conflict_do_nothing()
+)
+INSERT_REVIEW = (
+    insert(Review)
+    .values(
+        course_id=bindparam("course_id"),
+        user_id=bindparam("user_id"),
+        rating=bindparam("rating"),
+        comment=bindparam("comment"),
+    )
+    .on_conflict_do_nothing(index_elements=[Review.course_id, Review.user_id])
+    .returning(Review)
+)
+
+# Full-text search: rank matches on the GIN-indexed search_vector, then build
+# highlighted snippets only for the page being returned (ts_headline re-parses
+# the text, so it must not run for every match)
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+_search_query = func.websearch_to_tsquery(SEARCH_CONFIG, bindparam("q"))
+_search_rank = func.ts_rank(Course.search_vector, _search_query)
+
+def _escape_html(text):
+    """Course text is instructor-written: escape it so the <mark> tags are the only markup"""
+    for char, entity in (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;")):
+        text = func.replace(text, char, entity)
+    return text
+
+def _course_search(after_cursor: bool):
+    ranked = (
+        select(Course.id, _search_rank.label("rank"))
+        .where(Course.search_vector.op("@@")(_search_query))
+        .order_by(_search_rank.desc(), Course.id)
+        .offset(bindparam("skip"))
+        .limit(bindparam("limit"))
+    )
+    if after_cursor:
+        after_rank = bindparam("after_rank")
+        ranked = ranked.where(or_(
+            _search_rank < after_rank,
+            and_(_search_rank == after_rank, Course.id > bindparam("after_id")),
+        ))
+    ranked = ranked.subquery()
+    return (
+        select(
+            *COURSE_ROW_COLUMNS,
+            ranked.c.rank,
+            func.ts_headline(
+                SEARCH_CONFIG,
+                _escape_html(func.coalesce(Course.short_description, "") + " " + func.coalesce(Course.description, "")),
+                _search_query,
+                "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2",
+            ).label("headline"),
+        )
+        .join(ranked, ranked.c.id == Course.id)
+        .order_by(ranked.c.rank.desc(), Course.id)
+    )
+
+COURSE_SEARCH = _course_search(after_cursor=False)
+COURSE_SEARCH_AFTER = _course_search(after_cursor=True)
@@ -0,0 +1,56 @@
+import itertools
+import time
+from typing import Optional
+from fastapi import Request
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import decode_token
+from app.db.database import AsyncSessionLocal, ReplicaSessionLocals
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+STICKY_COOKIE = "primary_until"
+
+_replicas = itertools.cycle(ReplicaSessionLocals) if ReplicaSessionLocals else None
+
+# Users who wrote recently, for clients that do not keep cookies
+_recent_writers = TTLCache(maxsize=100000, ttl=settings.READ_YOUR_WRITES_SECONDS)
+
+def _token_subject(request: Request) -> Optional[str]:
+    authorization = request.headers.get("authorization", "")
+    if not authorization.lower().startswith("bearer "):
+        return None
+    payload = decode_token(authorization[7:])
+    return payload.get("sub") if payload else None
+
+async def read_your_writes_middleware(request: Request, call_next):
+    """Pin a client to the primary for a short window after it writes.
+
+    The window travels in a cookie so it holds across workers; bearer-token
+    clients are also remembered per user on this worker.
+    """
+    now = time.time()
+    subject = _token_subject(request)
+    try:
+        use_primary = float(request.cookies.get(STICKY_COOKIE, 0)) > now
+    except ValueError:
+        use_primary = False
+    if not use_primary and subject is not None:
+        use_primary = _recent_writers.get(subject, False)
+    request.state.use_primary = use_primary
+
+    response = await call_next(request)
+
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        window = settings.READ_YOUR_WRITES_SECONDS
+        response.set_cookie(STICKY_COOKIE, str(int(now + window)), max_age=window, httponly=True, samesite="lax")
+        if subject is not None:
+            _recent_writers.set(subject, True)
+    return response
+
+async def get_async_read_db(request: Request):
+    """AsyncSession for read-only routes: a replica, unless the client wrote recently"""
+    replica = _replicas is not None and not getattr(request.state, "use_primary", False)
+    session_factory = next(_replicas) if replica else AsyncSessionLocal
+    async with session_factory() as db:
+        db.info["replica"] = replica  # shared caches are filled from the primary only
+        yield db
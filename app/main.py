@@ -1,7 +1,21 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.db.database import engine, Base
+from app.core.compression import CompressionMiddleware
+from app.core.negotiation import MessagePackMiddleware
+from app.core.hashing import password_hasher
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.revocation import purge_expired_revocations
+from app.db.database import engine
+from app.db.migrator import pending as pending_migrations
+from app.services.suggest import refresh_suggestions
+from app.services.course_cache import course_cache
+from app.services.catalog_snapshot import catalog_snapshots
+from app.services.sync import prune_tombstones
+from app.db.routing import read_your_writes_middleware
+from app.db.instrumentation import instrument_engines, query_metrics_middleware
 
 # Version: 1.0.1 - Fixed Python 3.13 type annotation issues
 # Import all routers
@@ -17,17 +31,37 @@ from app.routes import (
     payments,
     admin,
     daily_classes,
+    sync,
     test
 )
 
-# Create tables
-try:
-    Base.metadata.create_all(bind=engine)
-    print("✅ Database tables created successfully")
-except Exception as e:
-    print(f"⚠️  Warning: Could not create tables - {e}")
-    print("Make sure PostgreSQL database is created first:")
-    print("  Run: python create_db.py")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema changes are applied by migrate.py at deploy time, not by workers
+    try:
+        behind = pending_migrations(engine)
+        if behind:
+            print(f"⚠️  Warning: {len(behind)} pending database migration(s). Run: python migrate.py")
+    except Exception as e:
+        print(f"⚠️  Warning: Could not check database migrations - {e}")
+        print("Make sure PostgreSQL database is created first:")
+        print("  Run: python create_db.py && python migrate.py")
+    suggest_refresher = asyncio.create_task(refresh_suggestions(settings.SUGGEST_REBUILD_SECONDS))
+    catalog_refresher = (
+        asyncio.create_task(catalog_snapshots.refresh(settings.CATALOG_SNAPSHOT_SECONDS))
+        if settings.CATALOG_SNAPSHOT else None
+    )
+    tombstone_pruner = asyncio.create_task(prune_tombstones())
+    revocation_purger = asyncio.create_task(purge_expired_revocations())
+    yield
+    suggest_refresher.cancel()
+    tombstone_pruner.cancel()
+    revocation_purger.cancel()
+    if catalog_refresher:
+        catalog_refresher.cancel()
+    course_cache.shutdown()
+    # Stop the password hashing worker processes
+    password_hasher.shutdown()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -35,7 +69,8 @@ app = FastAPI(
     description="CodeMaster API - Online Learning Platform with Authentication, Courses, Cart, Orders, and Enrollment",
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -45,8 +80,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Link", "ETag"],
 )
 
+# Accept: application/msgpack gets the same structures as MessagePack (mobile clients)
+app.add_middleware(MessagePackMiddleware)
+
+# Compress large bodies (course detail, admin orders and users)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+# Route catalog reads to replicas and skip the per-worker catalog snapshot,
+# except right after a client writes
+if settings.DATABASE_REPLICA_URLS or settings.CATALOG_SNAPSHOT:
+    app.middleware("http")(read_your_writes_middleware)
+
+# Per-request query counts, DB time and N+1 warnings
+if settings.SQL_INSTRUMENTATION:
+    instrument_engines()
+    app.middleware("http")(query_metrics_middleware)
+
 # Mount Static Files
 from fastapi.staticfiles import StaticFiles
 import os
@@ -67,6 +124,7 @@ app.include_router(instructor.router, prefix=api_prefix)
 app.include_router(payments.router, prefix=api_prefix)
 app.include_router(admin.router, prefix=api_prefix)
 app.include_router(daily_classes.router, prefix=api_prefix)
+app.include_router(sync.router, prefix=api_prefix)
 app.include_router(test.router)
 
 @app.get("/")
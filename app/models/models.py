@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Table, Index, UniqueConstraint, Computed
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 from app.db.database import Base
 
@@ -7,17 +8,19 @@ from app.db.database import Base
 wishlist_association = Table(
     'wishlist',
     Base.metadata,
-    Column('user_id', Integer, ForeignKey('user.id', ondelete='CASCADE')),
-    Column('course_id', Integer, ForeignKey('course.id', ondelete='CASCADE'))
+    Column('user_id', Integer, ForeignKey('user.id', ondelete='CASCADE'), primary_key=True),
+    Column('course_id', Integer, ForeignKey('course.id', ondelete='CASCADE'), primary_key=True),
+    Index('ix_wishlist_course_id', 'course_id')
 )
 
 # Association table for many-to-many relationship between users and courses (enrolled)
 enrollment_association = Table(
     'enrollment',
     Base.metadata,
-    Column('user_id', Integer, ForeignKey('user.id', ondelete='CASCADE')),
-    Column('course_id', Integer, ForeignKey('course.id', ondelete='CASCADE')),
-    Column('enrolled_at', DateTime, default=datetime.utcnow)
+    Column('user_id', Integer, ForeignKey('user.id', ondelete='CASCADE'), primary_key=True),
+    Column('course_id', Integer, ForeignKey('course.id', ondelete='CASCADE'), primary_key=True),
+    Column('enrolled_at', DateTime, default=datetime.utcnow),
+    Index('ix_enrollment_course_id', 'course_id')
 )
 
 class User(Base):
@@ -34,6 +37,9 @@ class User(Base):
     is_admin = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bumped on every cart / wishlist change; part of those responses' ETags
+    cart_version = Column(Integer, nullable=False, default=0, server_default="0")
+    wishlist_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
     courses_created = relationship("Course", back_populates="instructor")
@@ -43,6 +49,13 @@ class User(Base):
     reviews = relationship("Review", back_populates="user", cascade="all, delete-orphan")
     orders = relationship("Order", back_populates="user", cascade="all, delete-orphan")
 
+# Weighted search document: title (A) ranks above short_description (B) above description (C)
+COURSE_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(short_description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
 class Course(Base):
     __tablename__ = "course"
     
@@ -61,7 +74,7 @@ class Course(Base):
     duration = Column(String)
     lecture_count = Column(Integer, default=0)
     level = Column(String)  # Beginner, Intermediate, Advanced
-    category = Column(String, index=True)
+    category = Column(String)
     language = Column(String, default="English")
     certificate = Column(Boolean, default=True)
     is_bestseller = Column(Boolean, default=False)
@@ -71,6 +84,16 @@ class Course(Base):
     instructor_id = Column(Integer, ForeignKey("user.id"))
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Full-text search document maintained by PostgreSQL; deferred so normal loads skip it
+    search_vector = deferred(Column(TSVECTOR, Computed(COURSE_SEARCH_VECTOR, persisted=True)))
+    
+    __table_args__ = (
+        Index("ix_course_search_vector", "search_vector", postgresql_using="gin"),
+        # Category pages are ordered by id for keyset pagination
+        Index("ix_course_category_id", "category", "id"),
+        # Delta sync reads what changed since a client's token
+        Index("ix_course_updated_at", "updated_at"),
+    )
     
     # Relationships
     instructor = relationship("User", back_populates="courses_created")
@@ -78,11 +101,17 @@ class Course(Base):
     enrolled_users = relationship("User", secondary=enrollment_association, back_populates="enrolled_courses")
     cart_items = relationship("CartItem", back_populates="course", cascade="all, delete-orphan")
     reviews = relationship("Review", back_populates="course", cascade="all, delete-orphan")
-    sections = relationship("Section", back_populates="course", cascade="all, delete-orphan")
+    sections = relationship(
+        "Section", back_populates="course", cascade="all, delete-orphan", order_by="[Section.order, Section.id]"
+    )
     order_items = relationship("OrderItem", back_populates="course", cascade="all, delete-orphan")
 
 class CartItem(Base):
     __tablename__ = "cart_item"
+    __table_args__ = (
+        UniqueConstraint("user_id", "course_id", name="uq_cart_item_user_id_course_id"),
+        Index("ix_cart_item_course_id", "course_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("user.id", ondelete='CASCADE'))
@@ -95,6 +124,12 @@ class CartItem(Base):
 
 class Review(Base):
     __tablename__ = "review"
+    __table_args__ = (
+        # Leading course_id also serves the per-course review listing
+        UniqueConstraint("course_id", "user_id", name="uq_review_course_id_user_id"),
+        Index("ix_review_course_id_created_at_id", "course_id", "created_at", "id"),
+        Index("ix_review_user_id", "user_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     course_id = Column(Integer, ForeignKey("course.id", ondelete='CASCADE'))
@@ -109,6 +144,9 @@ class Review(Base):
 
 class Section(Base):
     __tablename__ = "section"
+    __table_args__ = (
+        Index("ix_section_course_id_order", "course_id", "order"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     course_id = Column(Integer, ForeignKey("course.id", ondelete='CASCADE'))
@@ -119,10 +157,15 @@ class Section(Base):
     
     # Relationships
     course = relationship("Course", back_populates="sections")
-    lectures = relationship("Lecture", back_populates="section", cascade="all, delete-orphan")
+    lectures = relationship(
+        "Lecture", back_populates="section", cascade="all, delete-orphan", order_by="[Lecture.order, Lecture.id]"
+    )
 
 class Lecture(Base):
     __tablename__ = "lecture"
+    __table_args__ = (
+        Index("ix_lecture_section_id_order", "section_id", "order"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     section_id = Column(Integer, ForeignKey("section.id", ondelete='CASCADE'))
@@ -137,6 +180,27 @@ class Lecture(Base):
     # Relationships
     section = relationship("Section", back_populates="lectures")
 
+class CourseDocument(Base):
+    """Prebuilt CourseDetailResponse JSON, without the live counters (app/services/course_documents.py)"""
+    __tablename__ = "course_document"
+    
+    course_id = Column(Integer, ForeignKey("course.id", ondelete='CASCADE'), primary_key=True)
+    document = Column(JSONB, nullable=False)
+    built_at = Column(DateTime, default=datetime.utcnow)
+
+class SyncTombstone(Base):
+    """A deleted course, daily class or enrollment, for delta sync (app/services/sync.py)"""
+    __tablename__ = "sync_tombstone"
+    __table_args__ = (
+        Index("ix_sync_tombstone_deleted_at", "deleted_at"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)  # course, daily_class, enrollment
+    entity_id = Column(Integer, nullable=False)  # course id for enrollments
+    user_id = Column(Integer, ForeignKey("user.id", ondelete='CASCADE'), nullable=True)  # set for enrollments
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
 class Order(Base):
     __tablename__ = "order"
     
@@ -153,9 +217,24 @@ class Order(Base):
     # Relationships
     user = relationship("User", back_populates="orders")
     order_items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_order_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_order_created_at", "created_at"),
+        # Small partial index for the admin manual-payment verification queue
+        Index(
+            "ix_order_pending_verification_created_at",
+            "created_at",
+            postgresql_where=(status == "pending_verification"),
+        ),
+    )
 
 class OrderItem(Base):
     __tablename__ = "order_item"
+    __table_args__ = (
+        Index("ix_order_item_order_id", "order_id"),
+        Index("ix_order_item_course_id", "course_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("order.id", ondelete='CASCADE'))
@@ -182,6 +261,10 @@ class PaymentMethod(Base):
 
 class DailyClass(Base):
     __tablename__ = "daily_class"
+    __table_args__ = (
+        Index("ix_daily_class_course_id_is_active_scheduled_date", "course_id", "is_active", "scheduled_date"),
+        Index("ix_daily_class_updated_at", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     course_id = Column(Integer, ForeignKey("course.id", ondelete='CASCADE'))
@@ -197,3 +280,11 @@ class DailyClass(Base):
     
     # Relationships
     course = relationship("Course", backref="daily_classes")
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_token"
+    
+    jti = Column(String, primary_key=True)
+    user_id = Column(Integer, ForeignKey("user.id", ondelete='CASCADE'), index=True)
+    expires_at = Column(DateTime, index=True)  # Row can be purged once the token would have expired anyway
+    revoked_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -1,9 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, status, File, UploadFile, Form
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.db.database import (
+    get_db, engine, pool_metrics, async_engine, async_pool_metrics, replica_engines, replica_pool_metrics
+)
+from app.db.repository import COURSE_BY_ID, INSERT_ENROLLMENT, USER_BY_EMAIL
 from app.models.models import User, Course, Order, DailyClass
-from app.core.security import get_current_admin, verify_password, create_access_token
+from app.core.security import get_current_admin, create_access_token, token_claims, password_needs_rehash
+from app.core.hashing import password_hasher
+from app.services.suggest import suggest_index
+from app.services.course_cache import course_cache
+from app.services.catalog_snapshot import catalog_snapshots
+from app.services.course_documents import drop_document
+from app.services.sync import COURSE, DAILY_CLASS, record_deletion
 from app.core.config import settings
+from app.core.negotiation import NegotiatedRoute
 from app.schemas.schemas import UserLogin, TokenResponse
 from pydantic import BaseModel
 from typing import List, Optional, Any
@@ -12,7 +24,7 @@ import shutil
 import os
 from pathlib import Path
 
-router = APIRouter(prefix="/admin", tags=["admin"])
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=NegotiatedRoute)
 
 class UserResponse(BaseModel):
     id: int
@@ -33,11 +45,11 @@ class DashboardStats(BaseModel):
     total_revenue: float
 
 @router.post("/login", response_model=TokenResponse)
-def admin_login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def admin_login(credentials: UserLogin, db: Session = Depends(get_db)):
     """Admin Login"""
-    user = db.query(User).filter(User.email == credentials.email).first()
+    user = await run_in_threadpool(db.scalar, USER_BY_EMAIL, {"email": credentials.email})
     
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    if not user or not await password_hasher.verify(credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -49,10 +61,16 @@ def admin_login(credentials: UserLogin, db: Session = Depends(get_db)):
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied: Admin privileges required"
         )
-        
+    
+    # Transparently upgrade hashes made with older Argon2 parameters
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await password_hasher.hash(credentials.password)
+        await run_in_threadpool(db.commit)
+        await run_in_threadpool(db.refresh, user)
+    
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id)},
+        data=token_claims(user),
         expires_delta=access_token_expires
     )
     
@@ -68,8 +86,8 @@ def get_all_users(
     current_user: Any = Depends(get_current_admin)
 ):
     """Get all users (Admin only)"""
-    users = db.query(User).all()
-    return users
+    # Only the serialized columns: no password hashes or profile text, no ORM entities
+    return db.execute(ADMIN_USERS).all()
 
 @router.get("/stats", response_model=DashboardStats)
 def get_dashboard_stats(
@@ -92,18 +110,54 @@ def get_dashboard_stats(
         "total_revenue": total_revenue
     }
 
+@router.get("/metrics")
+def get_metrics(current_user: Any = Depends(get_current_admin)):
+    """Get runtime metrics for this worker (Admin only)"""
+    return {
+        "password_hashing": password_hasher.stats(),
+        "course_suggestions": suggest_index.stats(),
+        "course_cache": course_cache.stats(),
+        "catalog_snapshot": catalog_snapshots.stats(),
+        "db_pool": pool_metrics.snapshot(engine.pool),
+        "async_db_pool": async_pool_metrics.snapshot(async_engine.sync_engine.pool),
+        "replica_db_pools": [
+            metrics.snapshot(replica_engine.sync_engine.pool)
+            for replica_engine, metrics in zip(replica_engines, replica_pool_metrics)
+        ],
+    }
+
 class OrderVerification(BaseModel):
     action: str # "approve" or "reject"
 
-@router.get("/orders")
+class AdminOrderResponse(BaseModel):
+    id: int
+    user_id: Optional[int]
+    total_price: Optional[float]
+    status: Optional[str]
+    payment_method: Optional[str]
+    payment_proof: Optional[str]
+    transaction_id: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+ADMIN_USERS = select(*(getattr(User, name) for name in UserResponse.model_fields)).order_by(User.id)
+ADMIN_ORDERS = select(*(getattr(Order, name) for name in AdminOrderResponse.model_fields))
+
+@router.get("/orders", response_model=List[AdminOrderResponse])
 def get_all_orders(
+    order_status: Optional[str] = Query(None, alias="status"),
     db: Session = Depends(get_db),
     current_user: Any = Depends(get_current_admin)
 ):
-    """Get all orders with user details (Admin only)"""
-    # Join with User to get user details efficiently if needed, or rely on lazy loading if configured
-    orders = db.query(Order).order_by(Order.created_at.desc()).all()
-    return orders
+    """Get all orders with user details, optionally by status (Admin only)"""
+    query = ADMIN_ORDERS
+    if order_status:
+        # status=pending_verification is served by a partial index
+        query = query.where(Order.status == order_status)
+    return db.execute(query.order_by(Order.created_at.desc())).all()
 
 @router.post("/orders/{order_id}/verify")
 def verify_order(
@@ -126,9 +180,8 @@ def verify_order(
         order.status = "completed"
         # Enroll user in courses
         for item in order.order_items:
-            course = db.query(Course).filter(Course.id == item.course_id).first()
-            if course and course not in user.enrolled_courses:
-                user.enrolled_courses.append(course)
+            course = db.scalar(COURSE_BY_ID, {"course_id": item.course_id})
+            if course and db.execute(INSERT_ENROLLMENT, {"user_id": user.id, "course_id": course.id}).rowcount:
                 course.enrolled_count += 1
         
     elif verification.action == "reject":
@@ -172,7 +225,7 @@ def admin_update_course(
     current_user: Any = Depends(get_current_admin)
 ):
     """Update a course (Admin only - no instructor restriction)"""
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = db.scalar(COURSE_BY_ID, {"course_id": course_id})
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     
@@ -219,8 +272,12 @@ def admin_update_course(
         course.preview_video = f"/static/uploads/courses/{vid_filename}"
     
     course.updated_at = datetime.utcnow()
+    drop_document(db, course.id)
     db.commit()
     db.refresh(course)
+    suggest_index.upsert(course)
+    course_cache.invalidate(course.id)
+    catalog_snapshots.invalidate()
     return course
 
 @router.delete("/courses/{course_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -230,12 +287,16 @@ def admin_delete_course(
     current_user: Any = Depends(get_current_admin)
 ):
     """Delete a course (Admin only - no instructor restriction)"""
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = db.scalar(COURSE_BY_ID, {"course_id": course_id})
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     
     db.delete(course)
+    record_deletion(db, COURSE, course_id)
     db.commit()
+    suggest_index.remove(course_id)
+    course_cache.invalidate(course_id)
+    catalog_snapshots.invalidate()
     return None
 
 # Daily Class Management
@@ -274,6 +335,12 @@ class DailyClassResponse(BaseModel):
     class Config:
         from_attributes = True
 
+def daily_class_response(daily_class: DailyClass, course_title: Optional[str]) -> DailyClassResponse:
+    # Returning the validated model means FastAPI serializes it without validating again
+    response = DailyClassResponse.model_validate(daily_class)
+    response.course_title = course_title
+    return response
+
 @router.post("/daily-classes", response_model=DailyClassResponse)
 def create_daily_class(
     daily_class: DailyClassCreate,
@@ -281,7 +348,7 @@ def create_daily_class(
     current_user: Any = Depends(get_current_admin)
 ):
     """Create a new daily class (Admin only)"""
-    course = db.query(Course).filter(Course.id == daily_class.course_id).first()
+    course = db.scalar(COURSE_BY_ID, {"course_id": daily_class.course_id})
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     
@@ -298,10 +365,7 @@ def create_daily_class(
     db.commit()
     db.refresh(db_daily_class)
     
-    return {
-        **db_daily_class.__dict__,
-        "course_title": course.title
-    }
+    return daily_class_response(db_daily_class, course.title)
 
 @router.get("/daily-classes", response_model=List[DailyClassResponse])
 def get_all_daily_classes(
@@ -310,20 +374,13 @@ def get_all_daily_classes(
     current_user: Any = Depends(get_current_admin)
 ):
     """Get all daily classes (Admin only)"""
-    query = db.query(DailyClass)
+    query = db.query(DailyClass, Course.title).outerjoin(Course, Course.id == DailyClass.course_id)
     if course_id:
         query = query.filter(DailyClass.course_id == course_id)
     
-    daily_classes = query.order_by(DailyClass.scheduled_date.desc()).all()
+    rows = query.order_by(DailyClass.scheduled_date.desc()).all()
     
-    result = []
-    for dc in daily_classes:
-        course = db.query(Course).filter(Course.id == dc.course_id).first()
-        result.append({
-            **dc.__dict__,
-            "course_title": course.title if course else None
-        })
-    return result
+    return [daily_class_response(dc, course_title) for dc, course_title in rows]
 
 @router.get("/daily-classes/{daily_class_id}", response_model=DailyClassResponse)
 def get_daily_class(
@@ -336,11 +393,8 @@ def get_daily_class(
     if not daily_class:
         raise HTTPException(status_code=404, detail="Daily class not found")
     
-    course = db.query(Course).filter(Course.id == daily_class.course_id).first()
-    return {
-        **daily_class.__dict__,
-        "course_title": course.title if course else None
-    }
+    course = db.scalar(COURSE_BY_ID, {"course_id": daily_class.course_id})
+    return daily_class_response(daily_class, course.title if course else None)
 
 @router.put("/daily-classes/{daily_class_id}", response_model=DailyClassResponse)
 def update_daily_class(
@@ -362,11 +416,8 @@ def update_daily_class(
     db.commit()
     db.refresh(daily_class)
     
-    course = db.query(Course).filter(Course.id == daily_class.course_id).first()
-    return {
-        **daily_class.__dict__,
-        "course_title": course.title if course else None
-    }
+    course = db.scalar(COURSE_BY_ID, {"course_id": daily_class.course_id})
+    return daily_class_response(daily_class, course.title if course else None)
 
 @router.delete("/daily-classes/{daily_class_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_daily_class(
@@ -380,5 +431,6 @@ def delete_daily_class(
         raise HTTPException(status_code=404, detail="Daily class not found")
     
     db.delete(daily_class)
+    record_deletion(db, DAILY_CLASS, daily_class_id)
     db.commit()
     return None
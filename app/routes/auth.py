@@ -1,20 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from datetime import timedelta
 from typing import Any
 from app.db.database import get_db
+from app.db.repository import USER_BY_EMAIL
 from app.models.models import User
 from app.schemas.schemas import UserCreate, UserResponse, UserLogin, TokenResponse
-from app.core.security import get_password_hash, verify_password, create_access_token, get_current_user
+from app.core.security import create_access_token, token_claims, get_current_user, get_current_principal, get_token_payload, revoke_token, password_needs_rehash
+from app.core.hashing import password_hasher
 from app.core.config import settings
+from app.core.negotiation import NegotiatedRoute
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=NegotiatedRoute)
 
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user and return access token"""
     # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await run_in_threadpool(db.scalar, USER_BY_EMAIL, {"email": user_data.email})
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -25,17 +29,17 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     new_user = User(
         name=user_data.name,
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await password_hasher.hash(user_data.password),
         is_active=True
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await run_in_threadpool(db.commit)
+    await run_in_threadpool(db.refresh, new_user)
     
     # Generate access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(new_user.id)},
+        data=token_claims(new_user),
         expires_delta=access_token_expires
     )
     
@@ -46,13 +50,13 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     }
 
 @router.post("/login", response_model=TokenResponse)
-def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, db: Session = Depends(get_db)):
     """Login user and return access token"""
     # Find user by email
-    user = db.query(User).filter(User.email == credentials.email).first()
+    user = await run_in_threadpool(db.scalar, USER_BY_EMAIL, {"email": credentials.email})
     
     # Verify credentials
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    if not user or not await password_hasher.verify(credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -66,10 +70,16 @@ def login(credentials: UserLogin, db: Session = Depends(get_db)):
             detail="User account is inactive"
         )
     
+    # Transparently upgrade hashes made with older Argon2 parameters
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await password_hasher.hash(credentials.password)
+        await run_in_threadpool(db.commit)
+        await run_in_threadpool(db.refresh, user)
+    
     # Generate access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id)},
+        data=token_claims(user),
         expires_delta=access_token_expires
     )
     
@@ -85,16 +95,26 @@ def get_current_user_profile(current_user: Any = Depends(get_current_user)):
     return current_user
 
 @router.post("/logout")
-def logout(current_user: Any = Depends(get_current_user)):
-    """Logout current user (client should remove token)"""
+def logout(
+    payload: dict = Depends(get_token_payload),
+    current_user: Any = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    """Logout current user by revoking the presented token"""
+    revoke_token(db, payload)
     return {"message": "Successfully logged out"}
 
 @router.post("/refresh", response_model=TokenResponse)
-def refresh_token(current_user: Any = Depends(get_current_user)):
-    """Refresh access token"""
+def refresh_token(
+    payload: dict = Depends(get_token_payload),
+    current_user: Any = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Refresh access token; the presented token is revoked"""
+    revoke_token(db, payload)
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(current_user.id)},
+        data=token_claims(current_user),
         expires_delta=access_token_expires
     )
     
@@ -1,46 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Any
-from app.db.database import get_db
-from app.models.models import User, CartItem, Course
+from app.db.database import get_db, get_async_db
+from app.db.repository import (
+    CART_ITEMS_WITH_COURSE_BY_USER, CART_ITEM_BY_USER_AND_COURSE, CART_VALIDATORS, BUMP_CART_VERSION,
+    COURSE_FOR_REFERENCE, INSERT_CART_ITEM,
+)
+from app.models.models import User, CartItem
 from app.schemas.schemas import CartItemResponse, CartItemBase
-from app.core.security import get_current_user
+from app.core.security import get_current_principal, user_not_found
+from app.core.http_cache import conditional_response, weak_etag
+from app.core.negotiation import NegotiatedRoute
 
-router = APIRouter(prefix="/cart", tags=["cart"])
+router = APIRouter(prefix="/cart", tags=["cart"], route_class=NegotiatedRoute)
 
 @router.get("/", response_model=List[CartItemResponse])
-def get_cart(
-    current_user: Any = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_cart(
+    request: Request,
+    response: Response,
+    current_user: Any = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get current user's cart items"""
-    cart_items = db.query(CartItem).filter(CartItem.user_id == current_user.id).all()
-    return cart_items
+    validators = (await db.execute(CART_VALIDATORS, {"user_id": current_user.id})).first()
+    if validators is None:
+        raise user_not_found()
+    version, courses_modified = validators
+    not_modified = conditional_response(
+        request, response, weak_etag("cart", current_user.id, version, courses_modified), private=True
+    )
+    if not_modified:
+        return not_modified
+    cart_items = await db.scalars(CART_ITEMS_WITH_COURSE_BY_USER, {"user_id": current_user.id})
+    return cart_items.all()
 
 @router.post("/add", response_model=CartItemResponse)
 def add_to_cart(
     cart_item: CartItemBase,
-    current_user: Any = Depends(get_current_user),
+    current_user: Any = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Add course to cart"""
     # Check if already in cart
-    existing = db.query(CartItem).filter(
-        CartItem.user_id == current_user.id,
-        CartItem.course_id == cart_item.course_id
-    ).first()
+    existing = db.scalar(
+        CART_ITEM_BY_USER_AND_COURSE, {"user_id": current_user.id, "course_id": cart_item.course_id}
+    )
     
     if existing:
         raise HTTPException(status_code=400, detail="Course already in cart")
     
     # Check if course exists
-    course = db.query(Course).filter(Course.id == cart_item.course_id).first()
-    if not course:
+    if db.scalar(COURSE_FOR_REFERENCE, {"course_id": cart_item.course_id}) is None:
         raise HTTPException(status_code=404, detail="Course not found")
     
-    # Create new cart item
-    new_item = CartItem(user_id=current_user.id, course_id=cart_item.course_id)
-    db.add(new_item)
+    # Create new cart item (no row if an identical request got there first)
+    new_item = db.scalar(INSERT_CART_ITEM, {"user_id": current_user.id, "course_id": cart_item.course_id})
+    if new_item is None:
+        raise HTTPException(status_code=400, detail="Course already in cart")
+    db.execute(BUMP_CART_VERSION, {"user_id": current_user.id})
     db.commit()
     db.refresh(new_item)
     return new_item
@@ -48,7 +67,7 @@ def add_to_cart(
 @router.delete("/{cart_item_id}")
 def remove_from_cart(
     cart_item_id: int,
-    current_user: Any = Depends(get_current_user),
+    current_user: Any = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Remove item from cart"""
@@ -61,24 +80,28 @@ def remove_from_cart(
         raise HTTPException(status_code=404, detail="Cart item not found")
     
     db.delete(item)
+    db.execute(BUMP_CART_VERSION, {"user_id": current_user.id})
     db.commit()
     return {"message": "Item removed from cart"}
 
 @router.delete("/")
 def clear_cart(
-    current_user: Any = Depends(get_current_user),
+    current_user: Any = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Clear all items from cart"""
     db.query(CartItem).filter(CartItem.user_id == current_user.id).delete()
+    db.execute(BUMP_CART_VERSION, {"user_id": current_user.id})
     db.commit()
     return {"message": "Cart cleared"}
 
 @router.get("/count")
-def get_cart_count(
-    current_user: Any = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_cart_count(
+    current_user: Any = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get count of items in cart"""
-    count = db.query(CartItem).filter(CartItem.user_id == current_user.id).count()
+    count = await db.scalar(
+        select(func.count()).select_from(CartItem).where(CartItem.user_id == current_user.id)
+    )
     return {"count": count}
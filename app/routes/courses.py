@@ -1,16 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, status
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Any
+from typing import List, Literal, Optional, Any
 from app.db.database import get_db
+from app.db.routing import get_async_read_db
+from app.db.read_models import course_rows
+from app.db.repository import (
+    COURSE_EXISTS_BY_SLUG, COURSES_PAGE, COURSES_BY_CATEGORY, COURSE_DETAIL_BY_ID, COURSE_DETAIL_BY_SLUG,
+    COURSE_SEARCH, COURSE_SEARCH_AFTER, COURSES_VALIDATORS, COURSES_BY_CATEGORY_VALIDATORS, DAILY_CLASSES_VALIDATORS
+)
 from app.models.models import Course, User, DailyClass
-from app.schemas.schemas import CourseResponse, CourseDetailResponse
+from app.schemas.schemas import (
+    CourseResponse, CourseDetailResponse, CourseSearchResult, CourseSuggestion, CourseBrowseResponse
+)
 from datetime import datetime
+from app.core.config import settings
 from app.core.security import get_current_admin
+from app.core.pagination import decode_cursor, set_next_cursor
+from app.core.http_cache import conditional_response, latest, weak_etag
+from app.core.negotiation import NegotiatedRoute
+from app.services.suggest import suggest_index
+from app.services.course_cache import course_cache
+from app.services.course_documents import course_document, course_document_by_slug
+from app.services.catalog import CatalogFilters, browse
+from app.services.catalog_snapshot import catalog_snapshots
 import shutil
 import os
 from pathlib import Path
 
-router = APIRouter(prefix="/courses", tags=["courses"])
+router = APIRouter(prefix="/courses", tags=["courses"], route_class=NegotiatedRoute)
 
 @router.post("/", response_model=CourseResponse, status_code=status.HTTP_201_CREATED)
 def create_course(
@@ -58,7 +77,7 @@ def create_course(
     # Generate simple slug
     slug = title.lower().replace(" ", "-")
     # Check if slug exists
-    if db.query(Course).filter(Course.slug == slug).first():
+    if db.scalar(COURSE_EXISTS_BY_SLUG, {"slug": slug}):
         slug = f"{slug}-{int(datetime.utcnow().timestamp())}"
 
     new_course = Course(
@@ -79,56 +98,216 @@ def create_course(
     db.add(new_course)
     db.commit()
     db.refresh(new_course)
+    suggest_index.upsert(new_course)
+    catalog_snapshots.invalidate()
     
     return new_course
 
+def _reads_own_writes(request: Request) -> bool:
+    """Whether the client wrote recently, so per-worker caches may be behind it"""
+    return getattr(request.state, "use_primary", False)
+
+def _catalog_snapshot(request: Request):
+    """The current snapshot, unless the client wrote recently and must read its own writes"""
+    if _reads_own_writes(request):
+        return None
+    return catalog_snapshots.current()
+
 @router.get("/", response_model=List[CourseResponse])
-def get_all_courses(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all courses with pagination"""
-    courses = db.query(Course).offset(skip).limit(limit).all()
+async def get_all_courses(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get all courses with pagination (skip, or the cursor from X-Next-Cursor)"""
+    after_id, = decode_cursor(cursor, int) if cursor else (0,)
+    snapshot = _catalog_snapshot(request)
+    modified, count = snapshot.validators if snapshot else (await db.execute(COURSES_VALIDATORS)).one()
+    not_modified = conditional_response(request, response, weak_etag("courses", modified, count))
+    if not_modified:
+        return not_modified
+    if snapshot:
+        courses = snapshot.page(after_id, 0 if cursor else skip, limit)
+    else:
+        courses = course_rows(await db.execute(
+            COURSES_PAGE, {"after_id": after_id, "skip": 0 if cursor else skip, "limit": limit}
+        ))
+    set_next_cursor(request, response, courses, limit, lambda course: (course.id,))
     return courses
 
+@router.get("/suggest", response_model=List[CourseSuggestion])
+async def suggest_courses(q: str, limit: int = Query(8, ge=1, le=20)):
+    """Search-as-you-type suggestions from the in-memory index (no database query)"""
+    return suggest_index.suggest(q, limit)
+
+@router.get("/browse", response_model=CourseBrowseResponse)
+async def browse_courses(
+    request: Request,
+    response: Response,
+    category: Optional[List[str]] = Query(None),
+    level: Optional[List[str]] = Query(None),
+    language: Optional[List[str]] = Query(None),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    min_rating: Optional[float] = Query(None, ge=0, le=5),
+    bestseller: Optional[bool] = None,
+    trending: Optional[bool] = None,
+    new: Optional[bool] = None,
+    q: Optional[str] = None,
+    sort: Literal["relevance", "popular", "rating", "newest", "price_asc", "price_desc"] = "popular",
+    skip: int = Query(0, ge=0),
+    limit: int = Query(24, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Filter and sort the catalog, with per-value counts for category, level and language"""
+    # Free text needs the search index, so only filter-and-sort requests use the snapshot
+    snapshot = _catalog_snapshot(request) if not q else None
+    modified, count = snapshot.validators if snapshot else (await db.execute(COURSES_VALIDATORS)).one()
+    not_modified = conditional_response(request, response, weak_etag("courses", modified, count))
+    if not_modified:
+        return not_modified
+    filters = CatalogFilters(
+        category=tuple(category or ()),
+        level=tuple(level or ()),
+        language=tuple(language or ()),
+        min_price=min_price,
+        max_price=max_price,
+        min_rating=min_rating,
+        bestseller=bestseller,
+        trending=trending,
+        new=new,
+        q=q or None,
+    )
+    if snapshot:
+        return snapshot.browse(filters, sort, skip, limit)
+    return await browse(db, filters, sort, skip, limit)
+
 @router.get("/{course_id}", response_model=CourseDetailResponse)
-def get_course(course_id: int, db: Session = Depends(get_db)):
+async def get_course(
+    course_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)
+):
     """Get course details by ID"""
-    course = db.query(Course).filter(Course.id == course_id).first()
+    snapshot = await course_cache.aget(db, course_id, reload=_reads_own_writes(request))
+    if not snapshot:
+        raise HTTPException(status_code=404, detail="Course not found")
+    not_modified = conditional_response(
+        request, response, weak_etag("course", course_id, *snapshot.validators), latest(*snapshot.validators)
+    )
+    if not_modified:
+        return not_modified
+    if settings.COURSE_DOCUMENTS:
+        document = await course_document(db, course_id)
+        if document is None:
+            raise HTTPException(status_code=404, detail="Course not found")
+        return Response(document, media_type="application/json", headers=response.headers)
+    course = await db.scalar(COURSE_DETAIL_BY_ID, {"course_id": course_id})
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     return course
 
 @router.get("/category/{category}", response_model=List[CourseResponse])
-def get_courses_by_category(category: str, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get courses by category"""
-    courses = db.query(Course).filter(Course.category == category).offset(skip).limit(limit).all()
+async def get_courses_by_category(
+    category: str,
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get courses by category (skip, or the cursor from X-Next-Cursor)"""
+    after_id, = decode_cursor(cursor, int) if cursor else (0,)
+    snapshot = _catalog_snapshot(request)
+    if snapshot:
+        # Catalog-wide validators: coarser than the category's own, but free
+        modified, count = snapshot.validators
+    else:
+        modified, count = (await db.execute(COURSES_BY_CATEGORY_VALIDATORS, {"category": category})).one()
+    not_modified = conditional_response(
+        request, response, weak_etag("category", category, modified, count)
+    )
+    if not_modified:
+        return not_modified
+    if snapshot:
+        courses = snapshot.page(after_id, 0 if cursor else skip, limit, category=category)
+    else:
+        courses = course_rows(await db.execute(
+            COURSES_BY_CATEGORY,
+            {"category": category, "after_id": after_id, "skip": 0 if cursor else skip, "limit": limit},
+        ))
+    set_next_cursor(request, response, courses, limit, lambda course: (course.id,))
     return courses
 
-@router.get("/search/", response_model=List[CourseResponse])
-def search_courses(q: str, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Search courses by title or description"""
-    courses = db.query(Course).filter(
-        (Course.title.ilike(f"%{q}%")) | (Course.description.ilike(f"%{q}%"))
-    ).offset(skip).limit(limit).all()
-    return courses
+@router.get("/search/", response_model=List[CourseSearchResult])
+async def search_courses(
+    q: str,
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Full-text search over title, short description and description, best matches first"""
+    if cursor:
+        after_rank, after_id = decode_cursor(cursor, float, int)
+        rows = await db.execute(
+            COURSE_SEARCH_AFTER,
+            {"q": q, "after_rank": after_rank, "after_id": after_id, "skip": 0, "limit": limit},
+        )
+    else:
+        rows = await db.execute(COURSE_SEARCH, {"q": q, "skip": skip, "limit": limit})
+    results = [CourseSearchResult.model_validate(row._mapping) for row in rows]
+    set_next_cursor(request, response, results, limit, lambda result: (result.rank, result.id))
+    return results
 
 @router.get("/slug/{slug}", response_model=CourseDetailResponse)
-def get_course_by_slug(slug: str, db: Session = Depends(get_db)):
+async def get_course_by_slug(
+    slug: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)
+):
     """Get course details by slug"""
-    course = db.query(Course).filter(Course.slug == slug).first()
+    snapshot = await course_cache.aget_by_slug(db, slug, reload=_reads_own_writes(request))
+    if not snapshot:
+        raise HTTPException(status_code=404, detail="Course not found")
+    not_modified = conditional_response(
+        request, response, weak_etag("course", slug, *snapshot.validators), latest(*snapshot.validators)
+    )
+    if not_modified:
+        return not_modified
+    if settings.COURSE_DOCUMENTS:
+        document = await course_document_by_slug(db, slug)
+        if document is None:
+            raise HTTPException(status_code=404, detail="Course not found")
+        return Response(document, media_type="application/json", headers=response.headers)
+    course = await db.scalar(COURSE_DETAIL_BY_SLUG, {"slug": slug})
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     return course
 
 @router.get("/{course_id}/daily-classes")
-def get_course_daily_classes(course_id: int, db: Session = Depends(get_db)):
+async def get_course_daily_classes(
+    course_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)
+):
     """Get active daily classes for a course (visible to enrolled users)"""
-    course = db.query(Course).filter(Course.id == course_id).first()
+    validators = (await db.execute(DAILY_CLASSES_VALIDATORS, {"course_id": course_id})).first()
+    if not validators:
+        raise HTTPException(status_code=404, detail="Course not found")
+    not_modified = conditional_response(request, response, weak_etag("daily-classes", course_id, *validators))
+    if not_modified:
+        return not_modified
+    course = await course_cache.aget(db, course_id, reload=_reads_own_writes(request))
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     
-    daily_classes = db.query(DailyClass).filter(
-        DailyClass.course_id == course_id,
-        DailyClass.is_active == True
-    ).order_by(DailyClass.scheduled_date.asc()).all()
+    daily_classes = await db.scalars(
+        select(DailyClass).where(
+            DailyClass.course_id == course_id,
+            DailyClass.is_active == True
+        ).order_by(DailyClass.scheduled_date.asc())
+    )
     
     result = []
     for dc in daily_classes:
@@ -1,50 +1,54 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import List, Any
-from app.db.database import get_db
-from app.models.models import DailyClass, Course, User
-from app.core.security import get_current_user
+from app.db.database import get_db, get_async_db
+from app.models.models import DailyClass, Course, User, enrollment_association
+from app.core.security import get_current_user, get_current_principal
+from app.core.negotiation import NegotiatedRoute
+from app.services.course_cache import course_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/daily-classes", tags=["daily-classes"])
+router = APIRouter(prefix="/daily-classes", tags=["daily-classes"], route_class=NegotiatedRoute)
 
 @router.get("/upcoming")
-def get_upcoming_daily_classes(
-    db: Session = Depends(get_db),
-    current_user: Any = Depends(get_current_user)
+async def get_upcoming_daily_classes(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Any = Depends(get_current_principal)
 ):
     """Get all active daily classes for enrolled courses (both upcoming and past for recordings)"""
     try:
-        # Re-fetch user to ensure relationships are loaded
-        user = db.query(User).filter(User.id == current_user.id).first()
-        
-        if not user:
-            logger.error(f"User {current_user.id} not found in database")
-            return []
-        
         # Get user's enrolled course IDs
-        enrolled_course_ids = [course.id for course in user.enrolled_courses]
+        enrolled_course_ids = (await db.scalars(
+            select(enrollment_association.c.course_id).where(
+                enrollment_association.c.user_id == current_user.id
+            )
+        )).all()
         
-        logger.info(f"User {user.id} has {len(enrolled_course_ids)} enrolled courses: {enrolled_course_ids}")
+        logger.info(f"User {current_user.id} has {len(enrolled_course_ids)} enrolled courses: {enrolled_course_ids}")
         
         if not enrolled_course_ids:
-            logger.info(f"User {user.id} has no enrolled courses")
+            logger.info(f"User {current_user.id} has no enrolled courses")
             return []
         
         # Get all active classes for enrolled courses, ordered by most recent first
-        daily_classes = db.query(DailyClass).filter(
-            DailyClass.course_id.in_(enrolled_course_ids),
-            DailyClass.is_active == True
-        ).order_by(DailyClass.scheduled_date.desc()).limit(20).all()
+        rows = (await db.execute(
+            select(DailyClass, Course.title)
+            .outerjoin(Course, Course.id == DailyClass.course_id)
+            .where(
+                DailyClass.course_id.in_(enrolled_course_ids),
+                DailyClass.is_active == True
+            ).order_by(DailyClass.scheduled_date.desc()).limit(20)
+        )).all()
         
-        logger.info(f"Found {len(daily_classes)} daily classes for user {user.id}")
+        logger.info(f"Found {len(rows)} daily classes for user {current_user.id}")
         
         result = []
-        for dc in daily_classes:
-            course = db.query(Course).filter(Course.id == dc.course_id).first()
+        for dc, course_title in rows:
             result.append({
                 "id": dc.id,
                 "course_id": dc.course_id,
@@ -56,7 +60,7 @@ def get_upcoming_daily_classes(
                 "duration_minutes": dc.duration_minutes,
                 "is_active": dc.is_active,
                 "created_at": dc.created_at.isoformat(),
-                "course_title": course.title if course else None
+                "course_title": course_title
             })
         
         return result
@@ -72,11 +76,7 @@ def debug_daily_classes_auth(
 ):
     """Debug endpoint for authenticated users to see their daily classes"""
     try:
-        # Re-fetch user to ensure relationships are loaded
-        user = db.query(User).filter(User.id == current_user.id).first()
-        
-        if not user:
-            return {"error": "User not found", "user_id": current_user.id}
+        user = current_user
         
         # Get user's enrolled course IDs
         enrolled_course_ids = [course.id for course in user.enrolled_courses]
@@ -91,16 +91,17 @@ def debug_daily_classes_auth(
             }
         
         # Get all active classes for enrolled courses
-        daily_classes = db.query(DailyClass).filter(
+        rows = db.query(DailyClass, Course.title).outerjoin(
+            Course, Course.id == DailyClass.course_id
+        ).filter(
             DailyClass.course_id.in_(enrolled_course_ids),
             DailyClass.is_active == True
         ).order_by(DailyClass.scheduled_date.desc()).all()
         
-        logger.info(f"[DEBUG-AUTH] Found {len(daily_classes)} daily classes for user {user.id}")
+        logger.info(f"[DEBUG-AUTH] Found {len(rows)} daily classes for user {user.id}")
         
         result = []
-        for dc in daily_classes:
-            course = db.query(Course).filter(Course.id == dc.course_id).first()
+        for dc, course_title in rows:
             result.append({
                 "id": dc.id,
                 "course_id": dc.course_id,
@@ -112,7 +113,7 @@ def debug_daily_classes_auth(
                 "duration_minutes": dc.duration_minutes,
                 "is_active": dc.is_active,
                 "created_at": dc.created_at.isoformat(),
-                "course_title": course.title if course else None
+                "course_title": course_title
             })
         
         return {
@@ -196,11 +197,7 @@ def debug_daily_classes(
 ):
     """Debug endpoint to check user enrollment and daily classes"""
     try:
-        # Re-fetch user
-        user = db.query(User).filter(User.id == current_user.id).first()
-        
-        if not user:
-            return {"error": "User not found", "user_id": current_user.id}
+        user = current_user
         
         # Get enrolled courses
         enrolled_courses = user.enrolled_courses
@@ -256,7 +253,7 @@ def get_daily_class_detail(class_id: int, db: Session = Depends(get_db), current
     # Verify user is enrolled in the class's course
     if daily_class.course_id not in [c.id for c in current_user.enrolled_courses]:
         raise HTTPException(status_code=403, detail="Not authorized to view this class")
-    course = db.query(Course).filter(Course.id == daily_class.course_id).first()
+    course = course_cache.get(db, daily_class.course_id)
     return {
         "id": daily_class.id,
         "course_id": daily_class.course_id,
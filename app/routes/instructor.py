@@ -2,12 +2,19 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import Any
 from app.db.database import get_db
+from app.db.repository import COURSE_BY_SLUG
 from app.models.models import Course, Section, Lecture, User
 from app.schemas.schemas import CourseCreate, CourseUpdate, CourseResponse, SectionResponse, LectureResponse
-from app.core.security import get_current_user
+from app.core.security import get_current_principal
+from app.core.negotiation import NegotiatedRoute
+from app.services.suggest import suggest_index
+from app.services.course_cache import course_cache
+from app.services.catalog_snapshot import catalog_snapshots
+from app.services.course_documents import drop_document
+from app.services.sync import COURSE, record_deletion
 from datetime import datetime
 
-router = APIRouter(prefix="/instructor", tags=["instructor"])
+router = APIRouter(prefix="/instructor", tags=["instructor"], route_class=NegotiatedRoute)
 
 
 def check_is_instructor(current_user: Any) -> Any:
@@ -21,13 +28,13 @@ def check_is_instructor(current_user: Any) -> Any:
 def create_course(
     course_data: CourseCreate,
     db: Session = Depends(get_db),
-    current_user: Any = Depends(get_current_user),
+    current_user: Any = Depends(get_current_principal),
 ):
     """Create a new course"""
     check_is_instructor(current_user)
     
     # Check if slug already exists
-    existing_course = db.query(Course).filter(Course.slug == course_data.slug).first()
+    existing_course = db.scalar(COURSE_BY_SLUG, {"slug": course_data.slug})
     if existing_course:
         raise HTTPException(status_code=400, detail="Course slug already exists")
     
@@ -38,13 +45,15 @@ def create_course(
     db.add(db_course)
     db.commit()
     db.refresh(db_course)
+    suggest_index.upsert(db_course)
+    catalog_snapshots.invalidate()
     return db_course
 
 
 @router.get("/courses", response_model=list[CourseResponse])
 def get_instructor_courses(
     db: Session = Depends(get_db),
-    current_user: Any = Depends(get_current_user),
+    current_user: Any = Depends(get_current_principal),
 ):
     """Get all courses created by the current instructor"""
     check_is_instructor(current_user)
@@ -59,7 +68,7 @@ def get_instructor_courses(
 def get_instructor_course(
     course_id: int,
     db: Session = Depends(get_db),
-    current_user: Any = Depends(get_current_user),
+    current_user: Any = Depends(get_current_principal),
 ):
     """Get a specific course created by the current instructor"""
     check_is_instructor(current_user)
@@ -78,7 +87,7 @@ def update_course(
     course_id: int,
     course_data: CourseUpdate,
     db: Session = Depends(get_db),
-    current_user: Any = Depends(get_current_user),
+    current_user: Any = Depends(get_current_principal),
 ):
     """Update a course (only by the course instructor)"""
     check_is_instructor(current_user)
@@ -96,8 +105,12 @@ def update_course(
         setattr(course, field, value)
     
     course.updated_at = datetime.utcnow()
+    drop_document(db, course.id)
     db.commit()
     db.refresh(course)
+    suggest_index.upsert(course)
+    course_cache.invalidate(course.id)
+    catalog_snapshots.invalidate()
     return course
 
 
@@ -105,7 +118,7 @@ def update_course(
 def delete_course(
     course_id: int,
     db: Session = Depends(get_db),
-    current_user: Any = Depends(get_current_user),
+    current_user: Any = Depends(get_current_principal),
 ):
     """Delete a course (only by the course instructor)"""
     check_is_instructor(current_user)
@@ -118,7 +131,11 @@ def delete_course(
         raise HTTPException(status_code=404, detail="Course not found")
     
     db.delete(course)
+    record_deletion(db, COURSE, course_id)
     db.commit()
+    suggest_index.remove(course_id)
+    course_cache.invalidate(course_id)
+    catalog_snapshots.invalidate()
     return None
 
 
@@ -127,7 +144,7 @@ def create_section(
     course_id: int,
     section_data: dict,  # title, description, order
     db: Session = Depends(get_db),
-    current_user: Any = Depends(get_current_user),
+    current_user: Any = Depends(get_current_principal),
 ):
     """Create a new section for a course"""
     check_is_instructor(current_user)
@@ -146,7 +163,10 @@ def create_section(
         order=section_data.get("order", 0),
     )
     db.add(db_section)
+    course.updated_at = datetime.utcnow()  # the curriculum is part of the course detail
+    drop_document(db, course_id)
     db.commit()
+    course_cache.invalidate(course_id)
     db.refresh(db_section)
     return db_section
 
@@ -156,7 +176,7 @@ def delete_section(
     course_id: int,
     section_id: int,
     db: Session = Depends(get_db),
-    current_user: Any = Depends(get_current_user),
+    current_user: Any = Depends(get_current_principal),
 ):
     """Delete a section from a course"""
     check_is_instructor(current_user)
@@ -176,7 +196,10 @@ def delete_section(
         raise HTTPException(status_code=404, detail="Section not found")
     
     db.delete(section)
+    course.updated_at = datetime.utcnow()  # the curriculum is part of the course detail
+    drop_document(db, course_id)
     db.commit()
+    course_cache.invalidate(course_id)
     return None
 
 
@@ -186,7 +209,7 @@ def create_lecture(
     section_id: int,
     lecture_data: dict,  # title, description, video_url, duration, order, is_preview
     db: Session = Depends(get_db),
-    current_user: Any = Depends(get_current_user),
+    current_user: Any = Depends(get_current_principal),
 ):
     """Create a new lecture in a section"""
     check_is_instructor(current_user)
@@ -215,7 +238,10 @@ def create_lecture(
         is_preview=lecture_data.get("is_preview", False),
     )
     db.add(db_lecture)
+    course.updated_at = datetime.utcnow()  # the curriculum is part of the course detail
+    drop_document(db, course_id)
     db.commit()
+    course_cache.invalidate(course_id)
     db.refresh(db_lecture)
     return db_lecture
 
@@ -226,7 +252,7 @@ def delete_lecture(
     section_id: int,
     lecture_id: int,
     db: Session = Depends(get_db),
-    current_user: Any = Depends(get_current_user),
+    current_user: Any = Depends(get_current_principal),
 ):
     """Delete a lecture from a section"""
     check_is_instructor(current_user)
@@ -246,5 +272,8 @@ def delete_lecture(
         raise HTTPException(status_code=404, detail="Lecture not found")
     
     db.delete(lecture)
+    course.updated_at = datetime.utcnow()  # the curriculum is part of the course detail
+    drop_document(db, course_id)
     db.commit()
+    course_cache.invalidate(course_id)
     return None
@@ -1,13 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional, Any
-from app.db.database import get_db
-from app.models.models import Order, OrderItem, CartItem, Course, User
+from app.db.database import get_db, get_async_db
+from app.db.repository import COURSE_BY_ID, CART_ITEMS_BY_USER, BUMP_CART_VERSION, INSERT_ENROLLMENT
+from app.models.models import Order, OrderItem, User
 from app.schemas.schemas import OrderCreate, OrderResponse
-from app.core.security import get_current_user
+from app.core.security import get_current_user, get_current_principal
+from app.core.pagination import decode_cursor, set_next_cursor
+from app.core.negotiation import NegotiatedRoute
+from app.services.sync import ENROLLMENT, record_deletion
 from datetime import datetime
 
-router = APIRouter(prefix="/orders", tags=["orders"])
+router = APIRouter(prefix="/orders", tags=["orders"], route_class=NegotiatedRoute)
+
+# Everything OrderResponse serializes, loaded up front (async sessions cannot lazy load)
+ORDER_RESPONSE_OPTIONS = (selectinload(Order.order_items).selectinload(OrderItem.course),)
 
 @router.post("/checkout", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 def create_order_from_cart(
@@ -18,9 +27,7 @@ def create_order_from_cart(
 ):
     """Create order from cart items"""
     # Get cart items
-    cart_items = db.query(CartItem).filter(
-        CartItem.user_id == current_user.id
-    ).all()
+    cart_items = db.scalars(CART_ITEMS_BY_USER, {"user_id": current_user.id}).all()
     
     if not cart_items:
         raise HTTPException(status_code=400, detail="Cart is empty")
@@ -82,14 +89,14 @@ def create_order_from_cart(
         )
         db.add(order_item)
         
-        # Enroll user in course
-        if course not in current_user.enrolled_courses:
-            current_user.enrolled_courses.append(course)
+        # Enroll user in course (no row if already enrolled)
+        if db.execute(INSERT_ENROLLMENT, {"user_id": current_user.id, "course_id": course.id}).rowcount:
             course.enrolled_count += 1
     
     # Clear cart
     for item in cart_items:
         db.delete(item)
+    db.execute(BUMP_CART_VERSION, {"user_id": current_user.id})
     
     db.commit()
     db.refresh(db_order)
@@ -109,7 +116,7 @@ def create_order(
     # Validate courses
     if order_data.course_ids:
         for course_id in order_data.course_ids:
-            course = db.query(Course).filter(Course.id == course_id).first()
+            course = db.scalar(COURSE_BY_ID, {"course_id": course_id})
             if not course:
                 raise HTTPException(
                     status_code=404,
@@ -150,8 +157,7 @@ def create_order(
         )
         db.add(order_item)
         
-        if course not in current_user.enrolled_courses:
-            current_user.enrolled_courses.append(course)
+        if db.execute(INSERT_ENROLLMENT, {"user_id": current_user.id, "course_id": course.id}).rowcount:
             course.enrolled_count += 1
     
     db.commit()
@@ -159,26 +165,36 @@ def create_order(
     return db_order
 
 @router.get("/", response_model=List[OrderResponse])
-def list_orders(
+async def list_orders(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db),
-    current_user: Any = Depends(get_current_user)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Any = Depends(get_current_principal)
 ):
-    """Get user's order history"""
-    orders = db.query(Order).filter(
-        Order.user_id == current_user.id
-    ).order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
+    """Get user's order history, newest first (skip, or the cursor from X-Next-Cursor)"""
+    query = select(Order).where(Order.user_id == current_user.id)
+    if cursor:
+        # Served by ix_order_user_id_created_at_id at any depth
+        query = query.where(tuple_(Order.created_at, Order.id) < tuple_(*decode_cursor(cursor, datetime, int)))
+        skip = 0
+    orders = (await db.scalars(
+        query.order_by(Order.created_at.desc(), Order.id.desc())
+        .offset(skip).limit(limit).options(*ORDER_RESPONSE_OPTIONS)
+    )).all()
+    set_next_cursor(request, response, orders, limit, lambda order: (order.created_at, order.id))
     return orders
 
 @router.get("/{order_id}", response_model=OrderResponse)
-def get_order(
+async def get_order(
     order_id: int,
-    db: Session = Depends(get_db),
-    current_user: Any = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Any = Depends(get_current_principal)
 ):
     """Get a specific order"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.get(Order, order_id, options=ORDER_RESPONSE_OPTIONS)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
@@ -193,7 +209,7 @@ def get_order(
 @router.get("/latest/details")
 def get_latest_order(
     db: Session = Depends(get_db),
-    current_user: Any = Depends(get_current_user)
+    current_user: Any = Depends(get_current_principal)
 ):
     """Get user's latest order"""
     order = db.query(Order).filter(
@@ -244,6 +260,7 @@ def request_refund(
         if course in current_user.enrolled_courses:
             current_user.enrolled_courses.remove(course)
             course.enrolled_count -= 1
+            record_deletion(db, ENROLLMENT, course.id, current_user.id)
     
     db.commit()
     
@@ -8,8 +8,10 @@ import os
 from pathlib import Path
 from app.core.config import settings
 from app.db.database import get_db
-from app.models.models import User, CartItem, Order, OrderItem, Course
-from app.core.security import get_current_user, get_current_admin
+from app.db.repository import BUMP_CART_VERSION, INSERT_ENROLLMENT
+from app.models.models import CartItem, Order, OrderItem, Course
+from app.core.security import get_current_user, get_current_admin, get_current_principal
+from app.core.negotiation import NegotiatedRoute
 from pydantic import BaseModel
 from typing import Optional, Any
 import smtplib
@@ -19,7 +21,7 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/payments", tags=["payments"])
+router = APIRouter(prefix="/payments", tags=["payments"], route_class=NegotiatedRoute)
 
 client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
 
@@ -113,7 +115,7 @@ def get_payment_methods(db: Session = Depends(get_db)):
 @router.post("/create-order")
 def create_payment_order(
     order_data: PaymentOrderCreate,
-    current_user: Any = Depends(get_current_user)
+    current_user: Any = Depends(get_current_principal)
 ):
     try:
         data = {
@@ -144,8 +146,7 @@ def verify_payment(
         client.utility.verify_payment_signature(params_dict)
         
         # Payment successful, create order in DB
-        # Re-fetch user to attach to session
-        user = db.query(User).filter(User.id == current_user.id).first()
+        user = current_user
         
         # Get cart items
         cart_items = user.cart_items
@@ -174,15 +175,15 @@ def verify_payment(
             )
             db.add(order_item)
             
-            # Enroll
+            # Enroll (no row if already enrolled)
             course = item.course
-            if course not in user.enrolled_courses:
-                user.enrolled_courses.append(course)
+            if db.execute(INSERT_ENROLLMENT, {"user_id": user.id, "course_id": course.id}).rowcount:
                 course.enrolled_count += 1
                 
         # Clear Cart
         for item in cart_items:
             db.delete(item)
+        db.execute(BUMP_CART_VERSION, {"user_id": user.id})
             
         db.commit()
         
@@ -203,10 +204,7 @@ async def create_manual_payment(
     current_user: Any = Depends(get_current_user)
 ):
     try:
-        # Re-fetch user to attach to session for lazy loading
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-             raise HTTPException(status_code=404, detail="User not found")
+        user = current_user
 
         # 1. Verify Cart
         cart_items = user.cart_items
@@ -252,6 +250,7 @@ async def create_manual_payment(
         # 5. Clear Cart
         for item in cart_items:
             db.delete(item)
+        db.execute(BUMP_CART_VERSION, {"user_id": user.id})
             
         db.commit()
         
@@ -1,42 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, selectinload
+from typing import Any, Optional
+from datetime import datetime
 from app.db.database import get_db
-from app.models.models import Review, Course, User
+from app.db.repository import COURSE_FOR_REFERENCE, INSERT_REVIEW
+from app.models.models import Review, User
 from app.schemas.schemas import ReviewCreate, ReviewUpdate, ReviewResponse
-from app.core.security import get_current_user
+from app.core.security import get_current_principal
+from app.core.pagination import decode_cursor, set_next_cursor
+from app.core.negotiation import NegotiatedRoute
 
-router = APIRouter(prefix="/reviews", tags=["reviews"])
+router = APIRouter(prefix="/reviews", tags=["reviews"], route_class=NegotiatedRoute)
 
 
 @router.post("/", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED)
 def create_review(
     review_data: ReviewCreate,
     db: Session = Depends(get_db),
-    current_user: Any = Depends(get_current_user),
+    current_user: Any = Depends(get_current_principal),
 ):
     """Create a new review for a course"""
     # Verify course exists
-    course = db.query(Course).filter(Course.id == review_data.course_id).first()
-    if not course:
+    if db.scalar(COURSE_FOR_REFERENCE, {"course_id": review_data.course_id}) is None:
         raise HTTPException(status_code=404, detail="Course not found")
     
-    # Check if user already reviewed this course
-    existing_review = db.query(Review).filter(
-        Review.course_id == review_data.course_id,
-        Review.user_id == current_user.id
-    ).first()
-    if existing_review:
+    # Create review (no row if the user already reviewed this course)
+    db_review = db.scalar(INSERT_REVIEW, {
+        "course_id": review_data.course_id,
+        "user_id": current_user.id,
+        "rating": review_data.rating,
+        "comment": review_data.comment,
+    })
+    if db_review is None:
         raise HTTPException(status_code=400, detail="You have already reviewed this course")
-    
-    # Create review
-    db_review = Review(
-        course_id=review_data.course_id,
-        user_id=current_user.id,
-        rating=review_data.rating,
-        comment=review_data.comment,
-    )
-    db.add(db_review)
     db.commit()
     db.refresh(db_review)
     return db_review
@@ -53,15 +50,24 @@ def get_review(review_id: str, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=list[ReviewResponse])
 def list_reviews(
+    request: Request,
+    response: Response,
     course_id: str = Query(...),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
-    """Get all reviews for a course"""
-    reviews = db.query(Review).filter(
-        Review.course_id == course_id
+    """Get reviews for a course, newest first (skip, or the cursor from X-Next-Cursor)"""
+    query = db.query(Review).filter(Review.course_id == course_id)
+    if cursor:
+        # Served by ix_review_course_id_created_at_id at any depth
+        query = query.filter(tuple_(Review.created_at, Review.id) < tuple_(*decode_cursor(cursor, datetime, int)))
+        skip = 0
+    reviews = query.order_by(Review.created_at.desc(), Review.id.desc()).options(
+        selectinload(Review.user)
     ).offset(skip).limit(limit).all()
+    set_next_cursor(request, response, reviews, limit, lambda review: (review.created_at, review.id))
     return reviews
 
 
@@ -70,7 +76,7 @@ def update_review(
     review_id: str,
     review_data: ReviewUpdate,
     db: Session = Depends(get_db),
-    current_user: Any = Depends(get_current_user),
+    current_user: Any = Depends(get_current_principal),
 ):
     """Update a review (only by the review author)"""
     review = db.query(Review).filter(Review.id == review_id).first()
@@ -94,7 +100,7 @@ def update_review(
 def delete_review(
     review_id: str,
     db: Session = Depends(get_db),
-    current_user: Any = Depends(get_current_user),
+    current_user: Any = Depends(get_current_principal),
 ):
     """Delete a review (only by the review author)"""
     review = db.query(Review).filter(Review.id == review_id).first()
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Optional
+from app.db.database import get_async_db
+from app.core.security import get_current_principal
+from app.core.negotiation import NegotiatedRoute
+from app.schemas.schemas import SyncChangesResponse
+from app.services.sync import changes
+
+router = APIRouter(prefix="/sync", tags=["sync"], route_class=NegotiatedRoute)
+
+@router.get("/changes", response_model=SyncChangesResponse)
+async def get_changes(
+    since: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Any = Depends(get_current_principal)
+):
+    """Courses, daily classes and enrollments changed since a sync token (everything without one)"""
+    # On the primary: a lagging replica could hide rows older than the token we hand out
+    return await changes(db, current_user.id, since)
@@ -1,13 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional, Any
 from pydantic import BaseModel
 from app.db.database import get_db
-from app.models.models import User, Course
+from app.db.repository import COURSE_BY_ID, INSERT_ENROLLMENT
+from app.models.models import User
 from app.schemas.schemas import UserResponse, UserUpdate
-from app.core.security import get_current_user, hash_password, verify_password
+from app.core.security import get_current_user
+from app.services.course_cache import course_cache
+from app.services.course_documents import drop_instructor_documents
+from app.core.hashing import password_hasher
+from app.core.negotiation import NegotiatedRoute
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=NegotiatedRoute)
 
 class PasswordChangeRequest(BaseModel):
     current_password: str
@@ -46,8 +52,11 @@ def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get
     if user_update.avatar:
         user.avatar = user_update.avatar
     
+    # Any user can own courses (admins create them too); a no-op for everyone else
+    drop_instructor_documents(db, user.id)
     db.commit()
     db.refresh(user)
+    course_cache.invalidate_instructor(user.id)
     return user
 
 @router.put("/profile/update", response_model=UserResponse)
@@ -79,12 +88,15 @@ def update_profile(
     # Note: phone, location, occupation, website are ignored as they don't exist in the User model
     # To store these fields, you would need to add them to the User model first
     
+    # Any user can own courses (admins create them too); a no-op for everyone else
+    drop_instructor_documents(db, user.id)
     db.commit()
     db.refresh(user)
+    course_cache.invalidate_instructor(user.id)
     return user
 
 @router.post("/password/change", status_code=status.HTTP_200_OK)
-def change_password(
+async def change_password(
     password_data: PasswordChangeRequest,
     db: Session = Depends(get_db),
     current_user: Any = Depends(get_current_user),
@@ -96,11 +108,11 @@ def change_password(
     if len(password_data.new_password) < 8:
         raise HTTPException(status_code=400, detail="Password must be at least 8 characters")
     
-    if not verify_password(password_data.current_password, current_user.hashed_password):
+    if not await password_hasher.verify(password_data.current_password, current_user.hashed_password):
         raise HTTPException(status_code=401, detail="Current password is incorrect")
     
-    current_user.hashed_password = hash_password(password_data.new_password)
-    db.commit()
+    current_user.hashed_password = await password_hasher.hash(password_data.new_password)
+    await run_in_threadpool(db.commit)
     return {"message": "Password changed successfully"}
 
 @router.get("/{user_id}/enrolled-courses")
@@ -118,14 +130,13 @@ def enroll_course(user_id: int, course_id: int, db: Session = Depends(get_db)):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = db.scalar(COURSE_BY_ID, {"course_id": course_id})
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     
-    if course in user.enrolled_courses:
+    if not db.execute(INSERT_ENROLLMENT, {"user_id": user.id, "course_id": course.id}).rowcount:
         raise HTTPException(status_code=400, detail="Already enrolled in this course")
     
-    user.enrolled_courses.append(course)
     course.enrolled_count += 1
     db.commit()
     return {"message": "Successfully enrolled in course"}
@@ -1,75 +1,93 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Any
-from app.db.database import get_db
-from app.models.models import User, Course
+from app.db.database import get_db, get_async_db
+from app.db.repository import (
+    COURSE_FOR_REFERENCE, INSERT_WISHLIST, WISHLIST_HAS_COURSE, WISHLIST_VALIDATORS, BUMP_WISHLIST_VERSION
+)
+from app.models.models import Course, wishlist_association
 from app.schemas.schemas import CourseWithInstructor
-from app.core.security import get_current_user
+from app.core.security import get_current_principal, user_not_found
+from app.core.http_cache import conditional_response, weak_etag
+from app.core.negotiation import NegotiatedRoute
+from app.services.course_cache import course_cache
 
-router = APIRouter(prefix="/wishlist", tags=["wishlist"])
+router = APIRouter(prefix="/wishlist", tags=["wishlist"], route_class=NegotiatedRoute)
 
 @router.get("/", response_model=List[CourseWithInstructor])
-def get_wishlist(
-    current_user: Any = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_wishlist(
+    request: Request,
+    response: Response,
+    current_user: Any = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get current user's wishlist"""
-    # Re-fetch user to ensure attached to current session
-    user = db.query(User).filter(User.id == current_user.id).first()
-    return user.wishlist_courses
+    validators = (await db.execute(WISHLIST_VALIDATORS, {"user_id": current_user.id})).first()
+    if validators is None:
+        raise user_not_found()
+    version, courses_modified = validators
+    not_modified = conditional_response(
+        request, response, weak_etag("wishlist", current_user.id, version, courses_modified), private=True
+    )
+    if not_modified:
+        return not_modified
+    courses = await db.scalars(
+        select(Course)
+        .join(wishlist_association, wishlist_association.c.course_id == Course.id)
+        .where(wishlist_association.c.user_id == current_user.id)
+        .options(selectinload(Course.instructor))
+    )
+    return courses.all()
 
 @router.post("/add/{course_id}")
 def add_to_wishlist(
     course_id: int,
-    current_user: Any = Depends(get_current_user),
+    current_user: Any = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Add course to wishlist"""
-    user = db.query(User).filter(User.id == current_user.id).first()
-    course = db.query(Course).filter(Course.id == course_id).first()
-    
-    if not course:
+    if db.scalar(COURSE_FOR_REFERENCE, {"course_id": course_id}) is None:
         raise HTTPException(status_code=404, detail="Course not found")
     
-    if course in user.wishlist_courses:
+    if not db.execute(INSERT_WISHLIST, {"user_id": current_user.id, "course_id": course_id}).rowcount:
         raise HTTPException(status_code=400, detail="Course already in wishlist")
     
-    user.wishlist_courses.append(course)
+    db.execute(BUMP_WISHLIST_VERSION, {"user_id": current_user.id})
     db.commit()
     return {"message": "Course added to wishlist"}
 
 @router.delete("/remove/{course_id}")
 def remove_from_wishlist(
     course_id: int,
-    current_user: Any = Depends(get_current_user),
+    current_user: Any = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Remove course from wishlist"""
-    user = db.query(User).filter(User.id == current_user.id).first()
-    course = db.query(Course).filter(Course.id == course_id).first()
-    
-    if not course:
+    if not course_cache.get(db, course_id):
         raise HTTPException(status_code=404, detail="Course not found")
     
-    if course not in user.wishlist_courses:
+    removed = db.execute(delete(wishlist_association).where(
+        wishlist_association.c.user_id == current_user.id,
+        wishlist_association.c.course_id == course_id,
+    )).rowcount
+    if not removed:
         raise HTTPException(status_code=400, detail="Course not in wishlist")
     
-    user.wishlist_courses.remove(course)
+    db.execute(BUMP_WISHLIST_VERSION, {"user_id": current_user.id})
     db.commit()
     return {"message": "Course removed from wishlist"}
 
 @router.get("/check/{course_id}")
-def check_in_wishlist(
+async def check_in_wishlist(
     course_id: int,
-    current_user: Any = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Any = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Check if course is in wishlist"""
-    user = db.query(User).filter(User.id == current_user.id).first()
-    course = db.query(Course).filter(Course.id == course_id).first()
-    
-    if not course:
+    if not await course_cache.aget(db, course_id):
         raise HTTPException(status_code=404, detail="Course not found")
     
-    is_wishlisted = course in user.wishlist_courses
+    is_wishlisted = await db.scalar(WISHLIST_HAS_COURSE, {"user_id": current_user.id, "course_id": course_id})
     return {"is_wishlisted": is_wishlisted}
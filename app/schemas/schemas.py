@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 
 # User Schemas
@@ -101,6 +101,28 @@ class CourseResponse(CourseBase):
     class Config:
         from_attributes = True
 
+class CourseSearchResult(CourseResponse):
+    rank: float
+    headline: str  # Safe HTML: the matching excerpt, escaped, with terms wrapped in <mark>
+
+class CourseSuggestion(BaseModel):
+    id: int
+    title: str
+    slug: str
+    category: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+class FacetValue(BaseModel):
+    value: str
+    count: int  # Matches with every other filter applied, i.e. if this value were selected
+
+class CourseBrowseResponse(BaseModel):
+    items: List[CourseResponse]
+    total: int
+    facets: Dict[str, List[FacetValue]]  # category, level, language
+
 class CourseDetailResponse(CourseResponse):
     instructor: UserResponse
     sections: List[SectionResponse] = []
@@ -182,3 +204,39 @@ class OrderResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+# Delta Sync Schemas
+class SyncDailyClass(BaseModel):
+    id: int
+    course_id: int
+    title: str
+    topic: Optional[str]
+    description: Optional[str]
+    meet_link: Optional[str]
+    scheduled_date: datetime
+    duration_minutes: Optional[int]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+class SyncEnrollment(BaseModel):
+    course_id: int
+    enrolled_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+class SyncDeleted(BaseModel):
+    courses: List[int] = []
+    daily_classes: List[int] = []  # Deleted or deactivated
+    enrollments: List[int] = []  # Course ids
+
+class SyncChangesResponse(BaseModel):
+    token: str  # Send back as ?since= on the next sync
+    reset: bool  # Full state: replace the local copy instead of merging
+    courses: List[CourseResponse]
+    daily_classes: List[SyncDailyClass]
+    enrollments: List[SyncEnrollment]
+    deleted: SyncDeleted
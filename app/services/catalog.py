@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import and_, func, literal_column, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.read_models import COURSE_ROW_COLUMNS, course_rows
+from app.db.repository import SEARCH_CONFIG
+from app.models.models import Course
+
+# Multi-select facets. A facet's counts apply every filter except its own,
+# so picking "Development" still shows how many courses the other
+# categories have.
+FACETS = ("category", "level", "language")
+
+@dataclass(frozen=True)
+class CatalogFilters:
+    category: tuple[str, ...] = ()
+    level: tuple[str, ...] = ()
+    language: tuple[str, ...] = ()
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    min_rating: Optional[float] = None
+    bestseller: Optional[bool] = None
+    trending: Optional[bool] = None
+    new: Optional[bool] = None
+    q: Optional[str] = None
+
+    def tsquery(self):
+        return func.websearch_to_tsquery(SEARCH_CONFIG, self.q)
+
+    def conditions(self) -> tuple[list, dict]:
+        """(conditions shared by every count, {facet: its own condition})"""
+        shared = []
+        if self.min_price is not None:
+            shared.append(Course.price >= self.min_price)
+        if self.max_price is not None:
+            shared.append(Course.price <= self.max_price)
+        if self.min_rating is not None:
+            shared.append(Course.rating >= self.min_rating)
+        for flag, column in (
+            (self.bestseller, Course.is_bestseller),
+            (self.trending, Course.is_trending),
+            (self.new, Course.is_new),
+        ):
+            if flag is not None:
+                shared.append(column.is_(flag))
+        if self.q:
+            shared.append(Course.search_vector.op("@@")(self.tsquery()))
+        own = {
+            facet: getattr(Course, facet).in_(values)
+            for facet in FACETS
+            if (values := getattr(self, facet))
+        }
+        return shared, own
+
+def _order_by(filters: CatalogFilters, sort: str) -> list:
+    if sort == "relevance" and filters.q:
+        return [func.ts_rank(Course.search_vector, filters.tsquery()).desc(), Course.id]
+    return {
+        "rating": [Course.rating.desc().nulls_last(), Course.id],
+        "newest": [Course.created_at.desc().nulls_last(), Course.id.desc()],
+        "price_asc": [Course.price.asc().nulls_last(), Course.id],
+        "price_desc": [Course.price.desc().nulls_last(), Course.id],
+    }.get(sort, [Course.enrolled_count.desc().nulls_last(), Course.id])
+
+def browse_statement(filters: CatalogFilters, sort: str, skip: int, limit: int):
+    shared, own = filters.conditions()
+    return (
+        select(*COURSE_ROW_COLUMNS)
+        .where(*shared, *own.values())
+        .order_by(*_order_by(filters, sort))
+        .offset(skip)
+        .limit(limit)
+    )
+
+def facets_statement(filters: CatalogFilters):
+    """Total and all facet counts in one scan, via GROUPING SETS.
+
+    Each grouping set gets its own FILTERed count: category rows count with
+    the level and language selections applied but not the category one, and
+    so on; the empty set gives the total with everything applied.
+    """
+    shared, own = filters.conditions()
+
+    def count_excluding(facet: Optional[str]):
+        return func.count().filter(and_(true(), *(c for name, c in own.items() if name != facet)))
+
+    columns = [getattr(Course, facet) for facet in FACETS]
+    return (
+        select(
+            *columns,
+            func.grouping(*columns).label("grouping"),
+            count_excluding(None).label("total"),
+            *(count_excluding(facet).label(f"{facet}_count") for facet in FACETS),
+        )
+        .where(*shared)
+        .group_by(func.grouping_sets(*columns, literal_column("()")))
+    )
+
+# grouping() sets a bit for every column that is NOT grouped in the row's set,
+# first column highest, so each single-column set has one bit clear
+_GROUPING_FACET = {
+    (1 << len(FACETS)) - 1 - (1 << (len(FACETS) - 1 - i)): facet for i, facet in enumerate(FACETS)
+}
+
+async def facet_counts(db: AsyncSession, filters: CatalogFilters) -> tuple[int, dict]:
+    total = 0
+    facets: dict[str, list] = {facet: [] for facet in FACETS}
+    for row in await db.execute(facets_statement(filters)):
+        facet = _GROUPING_FACET.get(row.grouping)
+        if facet is None:
+            total = row.total
+            continue
+        value, count = getattr(row, facet), getattr(row, f"{facet}_count")
+        if value is not None and count:
+            facets[facet].append({"value": value, "count": count})
+    for values in facets.values():
+        values.sort(key=lambda item: (-item["count"], item["value"]))
+    return total, facets
+
+async def browse(db: AsyncSession, filters: CatalogFilters, sort: str, skip: int, limit: int) -> dict:
+    items = course_rows(await db.execute(browse_statement(filters, sort, skip, limit)))
+    total, facets = await facet_counts(db, filters)
+    return {"items": items, "total": total, "facets": facets}
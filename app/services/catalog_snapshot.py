@@ -0,0 +1,215 @@
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Optional
+import numpy as np
+from sqlalchemy import select
+from app.db.database import AsyncSessionLocal
+from app.models.models import Course
+from app.schemas.schemas import CourseResponse
+from app.services.catalog import FACETS, CatalogFilters
+
+logger = logging.getLogger(__name__)
+
+_NULL_FLAG = -1
+
+def _codes(values: list) -> tuple[np.ndarray, list]:
+    """Dictionary-encode strings: (int32 code per row, names); NULL/empty has no code (-1)"""
+    names = sorted({value for value in values if value})
+    index = {name: code for code, name in enumerate(names)}
+    return np.array([index.get(value, -1) for value in values], dtype=np.int32), names
+
+def _floats(values: list) -> np.ndarray:
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+def _flags(values: list) -> np.ndarray:
+    return np.array([_NULL_FLAG if value is None else int(value) for value in values], dtype=np.int8)
+
+class CatalogSnapshot:
+    """Immutable column arrays over the whole course table, ordered by id.
+
+    Filters are boolean masks, facet counts are bincounts over dictionary
+    codes, and sorting only orders the rows that can reach the requested
+    page. Each row's CourseResponse is built once, when the snapshot is, so
+    a page costs no ORM objects and no validation.
+    """
+
+    def __init__(self, rows: list, generation: int = 0):
+        self.generation = generation
+        self.built_at = datetime.utcnow()
+        self.items = [CourseResponse.model_validate(row) for row in rows]
+        self.ids = np.array([row.id for row in rows], dtype=np.int64)
+        self.price = _floats([row.price for row in rows])
+        self.rating = _floats([row.rating for row in rows])
+        self.enrolled = np.array([-1 if row.enrolled_count is None else row.enrolled_count for row in rows], dtype=np.int64)
+        self.created = np.array([row.created_at or datetime.min for row in rows], dtype="datetime64[us]").astype(np.int64)
+        self.codes: dict[str, np.ndarray] = {}
+        self.names: dict[str, list] = {}
+        for facet in FACETS:
+            self.codes[facet], self.names[facet] = _codes([getattr(row, facet) for row in rows])
+        self.flags = {
+            "bestseller": _flags([row.is_bestseller for row in rows]),
+            "trending": _flags([row.is_trending for row in rows]),
+            "new": _flags([row.is_new for row in rows]),
+        }
+        # Same validators as the COURSES_VALIDATORS query, taken from the data served
+        updated = [row.updated_at for row in rows if row.updated_at is not None]
+        self.validators = (max(updated) if updated else None, len(rows))
+        for array in (self.ids, self.price, self.rating, self.enrolled, self.created, *self.codes.values(), *self.flags.values()):
+            array.flags.writeable = False
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _facet_mask(self, facet: str, values: tuple) -> Optional[np.ndarray]:
+        if not values:
+            return None
+        index = {name: code for code, name in enumerate(self.names[facet])}
+        wanted = [index[value] for value in values if value in index]
+        return np.isin(self.codes[facet], wanted)
+
+    def _masks(self, filters: CatalogFilters) -> tuple[np.ndarray, dict]:
+        """(mask shared by every count, {facet: its own mask}), as CatalogFilters.conditions()"""
+        shared = np.ones(len(self), dtype=bool)
+        # Comparisons with NaN are False, so NULL prices and ratings drop out as in SQL
+        if filters.min_price is not None:
+            shared &= self.price >= filters.min_price
+        if filters.max_price is not None:
+            shared &= self.price <= filters.max_price
+        if filters.min_rating is not None:
+            shared &= self.rating >= filters.min_rating
+        for name in ("bestseller", "trending", "new"):
+            flag = getattr(filters, name)
+            if flag is not None:
+                shared &= self.flags[name] == int(flag)
+        own = {}
+        for facet in FACETS:
+            mask = self._facet_mask(facet, getattr(filters, facet))
+            if mask is not None:
+                own[facet] = mask
+        return shared, own
+
+    def _sort_key(self, sort: str) -> tuple[np.ndarray, np.ndarray]:
+        """(primary key, tie-break key), both ascending; NULLs sort last"""
+        if sort == "rating":
+            return np.where(np.isnan(self.rating), np.inf, -self.rating), self.ids
+        if sort == "newest":
+            return -self.created, -self.ids
+        if sort == "price_asc":
+            return np.where(np.isnan(self.price), np.inf, self.price), self.ids
+        if sort == "price_desc":
+            return np.where(np.isnan(self.price), np.inf, -self.price), self.ids
+        return -self.enrolled, self.ids
+
+    def _top(self, rows: np.ndarray, sort: str, skip: int, limit: int) -> list:
+        key, tie = self._sort_key(sort)
+        wanted = skip + limit
+        if wanted < len(rows):
+            # Only rows that can reach the page need a full sort: the top
+            # ``wanted`` keys plus anything tied with the last of them
+            cutoff = np.partition(key[rows], wanted - 1)[wanted - 1]
+            rows = rows[key[rows] <= cutoff]
+        order = rows[np.lexsort((tie[rows], key[rows]))]
+        return [self.items[i] for i in order[skip:wanted]]
+
+    def browse(self, filters: CatalogFilters, sort: str, skip: int, limit: int) -> dict:
+        """Same result as app.services.catalog.browse(); free-text queries are not supported"""
+        shared, own = self._masks(filters)
+        matches = shared.copy()
+        for mask in own.values():
+            matches &= mask
+        facets = {}
+        for facet in FACETS:
+            mask = shared.copy()
+            for name, other in own.items():
+                if name != facet:
+                    mask &= other
+            codes = self.codes[facet][mask]
+            counts = np.bincount(codes[codes >= 0], minlength=len(self.names[facet]))
+            values = [{"value": self.names[facet][code], "count": int(count)} for code, count in enumerate(counts) if count]
+            values.sort(key=lambda item: (-item["count"], item["value"]))
+            facets[facet] = values
+        return {
+            "items": self._top(np.flatnonzero(matches), sort, skip, limit),
+            "total": int(matches.sum()),
+            "facets": facets,
+        }
+
+    def page(self, after_id: int, skip: int, limit: int, category: Optional[str] = None) -> list:
+        """The COURSES_PAGE / COURSES_BY_CATEGORY result: id order, after ``after_id``"""
+        start = int(np.searchsorted(self.ids, after_id, side="right"))
+        if category is None:
+            return self.items[start + skip:start + skip + limit]
+        code = self.names["category"].index(category) if category in self.names["category"] else None
+        if code is None:
+            return []
+        rows = start + np.flatnonzero(self.codes["category"][start:] == code)
+        return [self.items[i] for i in rows[skip:skip + limit]]
+
+class CatalogSnapshots:
+    """Holds the current snapshot and swaps in rebuilt ones atomically.
+
+    Course writes on this worker invalidate it; until a snapshot loaded after
+    the write lands, readers get None and query the database, so the writer
+    sees its change. Other workers' writes and counter changes show up on the
+    periodic rebuild.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._generation = 0  # bumped by invalidate(); a snapshot is current if loaded at the latest one
+        self._lock = threading.Lock()
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def current(self) -> Optional[CatalogSnapshot]:
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.generation != self._generation:
+            return None
+        return snapshot
+
+    def invalidate(self) -> None:
+        """Call after a course is created, updated or deleted"""
+        with self._lock:
+            self._generation += 1
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def rebuild(self) -> None:
+        generation = self._generation
+        rows = await load_catalog()
+        snapshot = await asyncio.to_thread(CatalogSnapshot, rows, generation)
+        with self._lock:
+            self._snapshot = snapshot
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "courses": len(snapshot) if snapshot else 0,
+            "current": self.current() is not None,
+            "built_at": snapshot.built_at.isoformat() if snapshot else None,
+        }
+
+    async def refresh(self, interval: float) -> None:
+        """Rebuild now, then every ``interval`` seconds or as soon as a write invalidates"""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        while True:
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("Rebuilding the catalog snapshot failed")
+            try:
+                await asyncio.wait_for(self._wake.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+_CATALOG = select(*(column for column in Course.__table__.c if column.key != "search_vector")).order_by(Course.id)
+
+async def load_catalog() -> list:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(_CATALOG)).all()
+
+catalog_snapshots = CatalogSnapshots()
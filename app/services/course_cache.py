@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Awaitable, Callable, Hashable, Optional
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal, SessionLocal
+from app.models.models import Course, User
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True, slots=True)
+class CourseSnapshot:
+    """The course row without its long text, plus the instructor's updated_at"""
+    id: int
+    slug: str
+    title: str
+    category: Optional[str]
+    level: Optional[str]
+    price: Optional[float]
+    original_price: Optional[float]
+    thumbnail: Optional[str]
+    rating: Optional[float]
+    review_count: Optional[int]
+    enrolled_count: Optional[int]
+    instructor_id: Optional[int]
+    updated_at: Optional[datetime]
+    instructor_updated_at: Optional[datetime]
+
+    @property
+    def validators(self) -> tuple:
+        """What the course detail's ETag is computed from"""
+        return self.updated_at, self.instructor_updated_at
+
+_snapshot = select(
+    *(getattr(Course, f.name) for f in fields(CourseSnapshot) if f.name != "instructor_updated_at"),
+    User.updated_at,
+).outerjoin(User, User.id == Course.instructor_id)
+SNAPSHOT_BY_ID = _snapshot.where(Course.id == bindparam("course_id"))
+SNAPSHOT_BY_SLUG = _snapshot.where(Course.slug == bindparam("slug"))
+
+def _statement(key: tuple):
+    kind, value = key
+    if kind == "id":
+        return SNAPSHOT_BY_ID, {"course_id": value}
+    return SNAPSHOT_BY_SLUG, {"slug": value}
+
+def _primary_loader(db: AsyncSession) -> Callable[..., Awaitable]:
+    """Load with ``db``, or with a primary session if ``db`` reads from a replica"""
+    async def load(statement, params):
+        if not db.info.get("replica"):
+            return (await db.execute(statement, params)).first()
+        async with AsyncSessionLocal() as primary:
+            return (await primary.execute(statement, params)).first()
+    return load
+
+class CourseCache:
+    """Read-through cache of course snapshots, keyed by id and slug.
+
+    A snapshot is served as-is for ``ttl`` seconds. For ``stale_ttl`` more it
+    is still served, but the first such read starts a background reload.
+    Concurrent misses on one key share a single query (single flight), so a
+    burst of traffic on a new course costs one round trip per worker.
+
+    Course writes on this worker invalidate immediately. Writes on other
+    workers, and enrolled_count changes, show up within the TTL; pass
+    ``reload=True`` for clients that must read their own writes. Misses
+    are loaded from the primary, never from a replica session.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, stale_ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, tuple[float, CourseSnapshot]]" = OrderedDict()  # id -> (loaded at, snapshot)
+        self._slugs: dict[str, int] = {}
+        self._inflight: dict[Hashable, Future] = {}
+        self._generation = 0  # bumped by invalidation, so loads that raced it are not stored
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="course-cache")
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _cached(self, key: tuple) -> tuple[Optional[CourseSnapshot], bool]:
+        """(snapshot, fresh) for a usable entry, else (None, False)"""
+        with self._lock:
+            course_id = key[1] if key[0] == "id" else self._slugs.get(key[1])
+            entry = self._entries.get(course_id)
+            if entry is None:
+                return None, False
+            loaded_at, snapshot = entry
+            age = time.monotonic() - loaded_at
+            if age >= self.ttl + self.stale_ttl:
+                self._drop(course_id)
+                return None, False
+            self._entries.move_to_end(course_id)
+            if age < self.ttl:
+                self.hits += 1
+                return snapshot, True
+            self.stale_hits += 1
+            return snapshot, False
+
+    def _drop(self, course_id: int) -> None:
+        entry = self._entries.pop(course_id, None)
+        if entry is not None:
+            self._slugs.pop(entry[1].slug, None)
+
+    def _store(self, snapshot: CourseSnapshot) -> None:
+        self._drop(snapshot.id)
+        self._entries[snapshot.id] = (time.monotonic(), snapshot)
+        self._slugs[snapshot.slug] = snapshot.id
+        while len(self._entries) > self.maxsize:
+            self._drop(next(iter(self._entries)))
+
+    def _claim(self, key: tuple) -> tuple[Future, bool, int]:
+        """The in-flight load for ``key`` and whether the caller has to run it"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False, self._generation
+            future = self._inflight[key] = Future()
+            return future, True, self._generation
+
+    def _finish(self, key: tuple, future: Future, generation: int, row) -> Optional[CourseSnapshot]:
+        snapshot = CourseSnapshot(*row) if row is not None else None
+        with self._lock:
+            self._inflight.pop(key, None)
+            if generation == self._generation:
+                if snapshot is not None:
+                    self._store(snapshot)
+                elif key[0] == "id":
+                    self._drop(key[1])
+        future.set_result(snapshot)
+        return snapshot
+
+    def _fail(self, key: tuple, future: Future, error: BaseException) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_exception(error)
+
+    def _refresh_in_background(self, key: tuple) -> None:
+        future, owner, generation = self._claim(key)
+        if not owner:
+            return
+
+        def reload() -> None:
+            try:
+                statement, params = _statement(key)
+                with SessionLocal() as db:
+                    row = db.execute(statement, params).first()
+            except Exception as exc:
+                logger.warning("Refreshing course snapshot %s failed: %s", key, exc)
+                self._fail(key, future, exc)
+                return
+            self._finish(key, future, generation, row)
+
+        self._refresher.submit(reload)
+
+    def _get(self, key: tuple, load: Callable) -> Optional[CourseSnapshot]:
+        snapshot, fresh = self._cached(key)
+        if snapshot is not None:
+            if not fresh:
+                self._refresh_in_background(key)
+            return snapshot
+        future, owner, generation = self._claim(key)
+        if not owner:
+            return future.result()
+        self.misses += 1
+        try:
+            row = load(*_statement(key))
+        except BaseException as exc:
+            self._fail(key, future, exc)
+            raise
+        return self._finish(key, future, generation, row)
+
+    async def _aget(self, key: tuple, load: Callable[..., Awaitable], reload: bool) -> Optional[CourseSnapshot]:
+        snapshot, fresh = self._cached(key) if not reload else (None, False)
+        if snapshot is not None:
+            if not fresh:
+                self._refresh_in_background(key)
+            return snapshot
+        future, owner, generation = self._claim(key)
+        if not owner:
+            return await asyncio.wrap_future(future)
+        self.misses += 1
+        try:
+            row = await load(*_statement(key))
+        except BaseException as exc:
+            self._fail(key, future, exc)
+            raise
+        return self._finish(key, future, generation, row)
+
+    def get(self, db: Session, course_id: int) -> Optional[CourseSnapshot]:
+        return self._get(("id", course_id), lambda statement, params: db.execute(statement, params).first())
+
+    def get_by_slug(self, db: Session, slug: str) -> Optional[CourseSnapshot]:
+        return self._get(("slug", slug), lambda statement, params: db.execute(statement, params).first())
+
+    async def aget(self, db: AsyncSession, course_id: int, reload: bool = False) -> Optional[CourseSnapshot]:
+        return await self._aget(("id", course_id), _primary_loader(db), reload)
+
+    async def aget_by_slug(self, db: AsyncSession, slug: str, reload: bool = False) -> Optional[CourseSnapshot]:
+        return await self._aget(("slug", slug), _primary_loader(db), reload)
+
+    def invalidate(self, course_id: int) -> None:
+        """Call after a course is updated or deleted (and its curriculum changed)"""
+        with self._lock:
+            self._generation += 1
+            self._drop(course_id)
+
+    def invalidate_instructor(self, user_id: int) -> None:
+        """Call after an instructor's profile changes (it is part of the course detail)"""
+        with self._lock:
+            self._generation += 1
+            for course_id in [cid for cid, (_, s) in self._entries.items() if s.instructor_id == user_id]:
+                self._drop(course_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._slugs.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+    def shutdown(self) -> None:
+        self._refresher.shutdown(wait=False, cancel_futures=True)
+
+course_cache = CourseCache(
+    maxsize=settings.COURSE_CACHE_MAXSIZE,
+    ttl=settings.COURSE_CACHE_TTL_SECONDS,
+    stale_ttl=settings.COURSE_CACHE_STALE_SECONDS,
+)
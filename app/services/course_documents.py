@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Text, bindparam, cast, delete, func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.db.database import AsyncSessionLocal
+from app.db.repository import COURSE_DETAIL_BY_ID
+from app.models.models import Course, CourseDocument, User
+from app.schemas.schemas import CourseDetailResponse
+
+# These change with every enrollment or review, so they are not stored:
+# they are read from the course row and merged into the document in SQL
+LIVE_FIELDS = ("rating", "review_count", "enrolled_count", "updated_at")
+
+_live = func.jsonb_build_object(
+    *(part for name in LIVE_FIELDS for part in (literal_column(f"'{name}'"), getattr(Course, name)))
+)
+# The finished response body as text, so a hit involves no JSON work in Python
+_document = select(cast(CourseDocument.document.op("||")(_live), Text)).join(
+    Course, Course.id == CourseDocument.course_id
+)
+DOCUMENT_BY_ID = _document.where(Course.id == bindparam("course_id"))
+DOCUMENT_BY_SLUG = _document.where(Course.slug == bindparam("slug"))
+
+# Invalidation runs in the transaction that changes the course, after that
+# transaction has written the course (or instructor) row. The builder holds a
+# FOR SHARE lock on those rows, so the write waits for a running build and the
+# DELETE that follows removes what it saved; a later build waits for the
+# change to commit. Sessions do not autoflush, hence drop_document() and
+# drop_instructor_documents() flush first.
+DELETE_DOCUMENT = (
+    delete(CourseDocument)
+    .where(CourseDocument.course_id == bindparam("course_id"))
+    .execution_options(synchronize_session=False)
+)
+DELETE_INSTRUCTOR_DOCUMENTS = (
+    delete(CourseDocument)
+    .where(CourseDocument.course_id.in_(select(Course.id).where(Course.instructor_id == bindparam("instructor_id"))))
+    .execution_options(synchronize_session=False)
+)
+
+def drop_document(db: Session, course_id: int) -> None:
+    """Delete a course's document; call after changing the course row"""
+    db.flush()
+    db.execute(DELETE_DOCUMENT, {"course_id": course_id})
+
+def drop_instructor_documents(db: Session, instructor_id: int) -> None:
+    """Delete the documents of every course by an instructor; call after changing the user row"""
+    db.flush()
+    db.execute(DELETE_INSTRUCTOR_DOCUMENTS, {"instructor_id": instructor_id})
+
+_LOCK_COURSE_BY_ID = (
+    select(Course.id, Course.instructor_id).where(Course.id == bindparam("course_id")).with_for_update(read=True)
+)
+_LOCK_COURSE_BY_SLUG = (
+    select(Course.id, Course.instructor_id).where(Course.slug == bindparam("slug")).with_for_update(read=True)
+)
+_LOCK_INSTRUCTOR = select(User.id).where(User.id == bindparam("user_id")).with_for_update(read=True)
+
+_building: dict[tuple, asyncio.Task] = {}
+
+def _lookup(key: tuple):
+    kind, value = key
+    if kind == "id":
+        return {"course_id": value}, DOCUMENT_BY_ID, _LOCK_COURSE_BY_ID
+    return {"slug": value}, DOCUMENT_BY_SLUG, _LOCK_COURSE_BY_SLUG
+
+async def _build(key: tuple) -> Optional[str]:
+    params, _, lock_course = _lookup(key)
+    # Always on the primary: a lagging replica could hand us the pre-change curriculum
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            row = (await db.execute(lock_course, params)).first()
+            if row is None:
+                return None
+            course_id, instructor_id = row
+            if instructor_id is not None:
+                await db.execute(_LOCK_INSTRUCTOR, {"user_id": instructor_id})
+            course = await db.scalar(COURSE_DETAIL_BY_ID, {"course_id": course_id})
+            document = CourseDetailResponse.model_validate(course).model_dump(mode="json", exclude=set(LIVE_FIELDS))
+            upsert = insert(CourseDocument).values(course_id=course_id, document=document, built_at=datetime.utcnow())
+            await db.execute(upsert.on_conflict_do_update(
+                index_elements=[CourseDocument.course_id],
+                set_={"document": upsert.excluded.document, "built_at": upsert.excluded.built_at},
+            ))
+            return await db.scalar(DOCUMENT_BY_ID, {"course_id": course_id})
+
+async def _load(db: AsyncSession, key: tuple) -> Optional[str]:
+    params, read, _ = _lookup(key)
+    document = await db.scalar(read, params)
+    if document is not None:
+        return document
+    # Concurrent first reads of a course on this worker share one build
+    task = _building.get(key)
+    if task is None:
+        task = _building[key] = asyncio.ensure_future(_build(key))
+        task.add_done_callback(lambda _: _building.pop(key, None))
+    return await asyncio.shield(task)
+
+async def course_document(db: AsyncSession, course_id: int) -> Optional[str]:
+    """CourseDetailResponse JSON for a course (None if it does not exist).
+
+    One indexed read when the document is current; after a change it is
+    rebuilt from the eager-loaded course tree and saved for the next reader.
+    """
+    return await _load(db, ("id", course_id))
+
+async def course_document_by_slug(db: AsyncSession, slug: str) -> Optional[str]:
+    return await _load(db, ("slug", slug))
@@ -0,0 +1,265 @@
+import asyncio
+import heapq
+import logging
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional
+from sqlalchemy import select
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.models import Course
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Match quality per query term, multiplied by the field weight of the token
+EXACT = 1.0
+PREFIX = 0.8
+FUZZY = {1: 0.6, 2: 0.4}  # by edit distance
+FIELD_WEIGHTS = (("title", 1.0), ("category", 0.6))
+POPULARITY_WEIGHT = 0.3
+MAX_PREFIX_EXPANSIONS = 500
+MAX_FUZZY_CANDIDATES = 40
+RESULT_CACHE_SIZE = 4096
+
+def tokenize(text: Optional[str]) -> list[str]:
+    """Lower-case ASCII words, with accents folded ("Café" -> "cafe")"""
+    folded = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode().lower()
+    return _WORD.findall(folded)
+
+def trigrams(token: str) -> set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (a transposition counts as one edit), capped at limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+@dataclass(frozen=True, slots=True)
+class Suggestion:
+    id: int
+    title: str
+    slug: str
+    category: Optional[str]
+    enrolled_count: int
+
+    @classmethod
+    def from_course(cls, course) -> "Suggestion":
+        return cls(course.id, course.title, course.slug, course.category, course.enrolled_count or 0)
+
+class SuggestIndex:
+    """In-process autocomplete over course titles and categories.
+
+    Tokens are kept sorted for prefix lookups, and a trigram map finds
+    candidates for typo tolerance. The last query word is matched as a
+    prefix (the user is still typing it) and the others as whole words.
+    Every word has to match. Scores favour title matches and popular courses
+    (log of enrolled_count).
+
+    Writes on this worker update the index immediately. Other workers pick up
+    changes on the periodic rebuild. Keystroke queries repeat across users,
+    so results are cached until the next change.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._courses: dict[int, Suggestion] = {}
+        self._postings: dict[str, dict[int, float]] = {}  # token -> {course id: field weight}
+        self._tokens: list[str] = []  # sorted keys of _postings
+        self._trigrams: dict[str, set[str]] = {}  # trigram -> tokens
+        self._popularity: dict[int, float] = {}  # course id -> log1p(enrolled_count)
+        self._popularity_scale = 1.0
+        self._results = TTLCache(maxsize=RESULT_CACHE_SIZE, ttl=settings.SUGGEST_REBUILD_SECONDS)
+        self._generation = 0  # bumped on every change, so stale results are never cached
+        self.built_at: Optional[datetime] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.built_at is not None
+
+    def __len__(self) -> int:
+        return len(self._courses)
+
+    @staticmethod
+    def _fields(entry: Suggestion):
+        for field, weight in FIELD_WEIGHTS:
+            for token in tokenize(getattr(entry, field)):
+                yield token, weight
+
+    def _add(self, entry: Suggestion) -> None:
+        self._courses[entry.id] = entry
+        self._popularity[entry.id] = math.log1p(entry.enrolled_count)
+        for token, weight in self._fields(entry):
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._tokens, token)
+                for gram in trigrams(token):
+                    self._trigrams.setdefault(gram, set()).add(token)
+            postings[entry.id] = max(weight, postings.get(entry.id, 0.0))
+        self._popularity_scale = max(self._popularity_scale, self._popularity[entry.id])
+
+    def _remove(self, course_id: int) -> None:
+        entry = self._courses.pop(course_id, None)
+        if entry is None:
+            return
+        del self._popularity[course_id]
+        for token, _ in self._fields(entry):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(course_id, None)
+            if not postings:
+                del self._postings[token]
+                del self._tokens[bisect_left(self._tokens, token)]
+                for gram in trigrams(token):
+                    tokens = self._trigrams[gram]
+                    tokens.discard(token)
+                    if not tokens:
+                        del self._trigrams[gram]
+
+    def upsert(self, course) -> None:
+        entry = Suggestion.from_course(course)
+        with self._lock:
+            self._remove(entry.id)
+            self._add(entry)
+            self._generation += 1
+        self._results.clear()
+
+    def remove(self, course_id: int) -> None:
+        with self._lock:
+            self._remove(course_id)
+            self._generation += 1
+        self._results.clear()
+
+    def rebuild(self, entries: Iterable[Suggestion]) -> None:
+        """Replace the whole index; it is built aside and swapped in"""
+        fresh = SuggestIndex()
+        for entry in entries:
+            fresh._add(entry)
+        with self._lock:
+            self._courses, self._postings = fresh._courses, fresh._postings
+            self._tokens, self._trigrams = fresh._tokens, fresh._trigrams
+            self._popularity, self._popularity_scale = fresh._popularity, fresh._popularity_scale
+            self.built_at = datetime.utcnow()
+            self._generation += 1
+        self._results.clear()
+
+    def _fuzzy_tokens(self, term: str, prefix: bool):
+        limit = 1 if len(term) <= 5 else 2
+        shared = Counter()
+        for gram in trigrams(term):
+            for token in self._trigrams.get(gram, ()):
+                shared[token] += 1
+        for token, count in shared.most_common(MAX_FUZZY_CANDIDATES):
+            if count < 2:
+                break
+            distance = edit_distance(term, token, limit)
+            if prefix and len(token) > len(term):
+                distance = min(distance, edit_distance(term, token[:len(term)], limit))
+            if distance <= limit:
+                yield token, distance
+
+    def _match_term(self, term: str, prefix: bool) -> dict[int, float]:
+        matches: dict[int, float] = {}
+
+        def credit(token: str, quality: float) -> None:
+            for course_id, weight in self._postings[token].items():
+                score = quality * weight
+                if score > matches.get(course_id, 0.0):
+                    matches[course_id] = score
+
+        if term in self._postings:
+            credit(term, EXACT)
+        if prefix:
+            start = bisect_left(self._tokens, term)
+            for token in self._tokens[start:start + MAX_PREFIX_EXPANSIONS]:
+                if not token.startswith(term):
+                    break
+                if token != term:
+                    credit(token, PREFIX)
+        # Typo tolerance only when the term matches nothing as typed
+        if not matches and len(term) >= 3:
+            for token, distance in self._fuzzy_tokens(term, prefix):
+                credit(token, FUZZY[distance])
+        return matches
+
+    def suggest(self, query: str, limit: int = 8) -> list[Suggestion]:
+        terms = tokenize(query)
+        if not terms:
+            return []
+        key = (" ".join(terms), limit)
+        cached = self._results.get(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            generation = self._generation
+            scores: Optional[dict[int, float]] = None
+            for i, term in enumerate(terms):
+                matches = self._match_term(term, prefix=i == len(terms) - 1)
+                if scores is None:
+                    scores = matches
+                else:
+                    scores = {cid: score + matches[cid] for cid, score in scores.items() if cid in matches}
+                if not scores:
+                    break
+
+            popularity = self._popularity
+            per_term = 1 / len(terms)
+            boost = POPULARITY_WEIGHT / self._popularity_scale
+            best = heapq.nlargest(
+                limit, scores.items(), key=lambda item: item[1] * per_term + boost * popularity[item[0]]
+            )
+            results = [self._courses[course_id] for course_id, _ in best]
+        if generation == self._generation:
+            self._results.set(key, results)
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "courses": len(self._courses),
+            "tokens": len(self._tokens),
+            "trigrams": len(self._trigrams),
+            "result_cache": self._results.stats(),
+            "built_at": self.built_at.isoformat() if self.built_at else None,
+        }
+
+suggest_index = SuggestIndex()
+
+async def load_suggestions() -> list[Suggestion]:
+    async with AsyncSessionLocal() as db:
+        rows = await db.execute(
+            select(Course.id, Course.title, Course.slug, Course.category, Course.enrolled_count)
+        )
+        return [Suggestion(id, title, slug, category, enrolled or 0) for id, title, slug, category, enrolled in rows]
+
+async def refresh_suggestions(interval: float) -> None:
+    """Rebuild the index now and then every ``interval`` seconds (picks up other workers' writes)"""
+    while True:
+        try:
+            entries = await load_suggestions()
+            await asyncio.to_thread(suggest_index.rebuild, entries)
+        except Exception:
+            logger.exception("Rebuilding the course suggestion index failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import and_, bindparam, delete, or_, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.db.database import AsyncSessionLocal
+from app.db.read_models import COURSE_ROW_COLUMNS, course_rows
+from app.models.models import Course, DailyClass, SyncTombstone, enrollment_association
+from app.schemas.schemas import SyncDailyClass
+
+logger = logging.getLogger(__name__)
+
+COURSE = "course"
+DAILY_CLASS = "daily_class"
+ENROLLMENT = "enrollment"
+_DELETED_KEYS = {COURSE: "courses", DAILY_CLASS: "daily_classes", ENROLLMENT: "enrollments"}
+
+def record_deletion(db: Session, entity: str, entity_id: int, user_id: Optional[int] = None) -> None:
+    """Call in the transaction that deletes the row.
+
+    Deleting a course also removes its daily classes and enrollments on the
+    client, so those need no tombstones of their own.
+    """
+    db.add(SyncTombstone(entity=entity, entity_id=entity_id, user_id=user_id))
+
+_enrollment = enrollment_association.c
+
+def _changes(full: bool) -> tuple:
+    """(courses, the user's daily classes, the user's enrollments), all or changed since ``since``"""
+    since = bindparam("since")
+    courses = select(*COURSE_ROW_COLUMNS).order_by(Course.id)
+    classes = (
+        select(*(getattr(DailyClass, name) for name in SyncDailyClass.model_fields), DailyClass.is_active)
+        .join(enrollment_association, and_(
+            _enrollment.course_id == DailyClass.course_id, _enrollment.user_id == bindparam("user_id")
+        ))
+        .order_by(DailyClass.id)
+    )
+    enrollments = (
+        select(_enrollment.course_id, _enrollment.enrolled_at)
+        .where(_enrollment.user_id == bindparam("user_id"))
+        .order_by(_enrollment.course_id)
+    )
+    if full:
+        return courses, classes.where(DailyClass.is_active == true()), enrollments
+    return (
+        courses.where(Course.updated_at > since),
+        # A new enrollment brings the course's existing classes with it
+        classes.where(or_(DailyClass.updated_at > since, _enrollment.enrolled_at > since)),
+        enrollments.where(_enrollment.enrolled_at > since),
+    )
+
+FULL_SYNC = _changes(full=True)
+DELTA_SYNC = _changes(full=False)
+TOMBSTONES_SINCE = select(SyncTombstone.entity, SyncTombstone.entity_id).where(
+    SyncTombstone.deleted_at > bindparam("since"),
+    or_(SyncTombstone.user_id.is_(None), SyncTombstone.user_id == bindparam("user_id")),
+).distinct()
+PRUNE_TOMBSTONES = delete(SyncTombstone).where(SyncTombstone.deleted_at < bindparam("before"))
+
+async def changes(db: AsyncSession, user_id: int, token: Optional[str]) -> dict:
+    """What changed for ``user_id`` since ``token`` (everything without one), and the next token.
+
+    The token is the time up to which the client is current, minus
+    SYNC_LAG_SECONDS: rows stamped in that window are sent again next time,
+    so a transaction that commits after the read is not missed. Clients
+    apply changes idempotently (upsert, then delete).
+    """
+    now = datetime.utcnow()
+    since = decode_cursor(token, datetime)[0] if token else None
+    # Tombstones are pruned after SYNC_TOMBSTONE_DAYS, so older tokens cannot see every deletion
+    reset = since is None or since < now - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+    high_water = now - timedelta(seconds=settings.SYNC_LAG_SECONDS)
+    if since is not None:
+        high_water = max(high_water, since)  # tokens never move backwards
+    params = {"user_id": user_id, "since": since}
+    courses_query, classes_query, enrollments_query = FULL_SYNC if reset else DELTA_SYNC
+    courses = course_rows(await db.execute(courses_query, params))
+    classes = (await db.execute(classes_query, params)).all()
+    enrollments = (await db.execute(enrollments_query, params)).all()
+    deleted: dict[str, list] = {key: [] for key in _DELETED_KEYS.values()}
+    if not reset:
+        deleted["daily_classes"] = [row.id for row in classes if not row.is_active]
+        present = {
+            COURSE: {course.id for course in courses},
+            DAILY_CLASS: {row.id for row in classes if row.is_active},
+            ENROLLMENT: {row.course_id for row in enrollments},
+        }
+        for entity, entity_id in await db.execute(TOMBSTONES_SINCE, params):
+            # Skip rows deleted and then created again since the token (re-enrollment)
+            if entity in present and entity_id not in present[entity]:
+                deleted[_DELETED_KEYS[entity]].append(entity_id)
+    return {
+        "token": encode_cursor(high_water),
+        "reset": reset,
+        "courses": courses,
+        "daily_classes": [row for row in classes if row.is_active],
+        "enrollments": enrollments,
+        "deleted": deleted,
+    }
+
+async def prune_tombstones(interval: float = 3600) -> None:
+    """Delete tombstones no accepted token can need, now and then every ``interval`` seconds"""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                before = datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+                await db.execute(PRUNE_TOMBSTONES, {"before": before})
+                await db.commit()
+        except Exception:
+            logger.exception("Pruning sync tombstones failed")
+        await asyncio.sleep(interval)
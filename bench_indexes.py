@@ -0,0 +1,218 @@
+"""
+EXPLAIN the router queries before and after the index pack
+Run: python bench_indexes.py --rows 1000000
+
+Builds the schema in a scratch PostgreSQL schema (default ``index_bench``)
+of the configured DATABASE_URL, drops the indexes and constraints added by
+the index pack, loads synthetic data with generate_series and runs
+EXPLAIN (ANALYZE, BUFFERS) for each hot router query. The indexes are then
+created and every query is explained again. The scratch schema is dropped
+at the end unless --keep is given; application tables are not touched.
+"""
+
+import argparse
+import json
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+from sqlalchemy.schema import AddConstraint
+from app.core.config import settings
+from app.models.models import Base
+
+# Indexes and constraints added by the index pack: (table, name)
+PACK_INDEXES = [
+    ("cart_item", "ix_cart_item_course_id"),
+    ("review", "ix_review_course_id_created_at_id"),
+    ("review", "ix_review_user_id"),
+    ("order", "ix_order_user_id_created_at_id"),
+    ("order", "ix_order_created_at"),
+    ("order", "ix_order_pending_verification_created_at"),
+    ("order_item", "ix_order_item_order_id"),
+    ("order_item", "ix_order_item_course_id"),
+    ("section", "ix_section_course_id_order"),
+    ("lecture", "ix_lecture_section_id_order"),
+    ("daily_class", "ix_daily_class_course_id_is_active_scheduled_date"),
+    ("wishlist", "ix_wishlist_course_id"),
+    ("enrollment", "ix_enrollment_course_id"),
+]
+PACK_CONSTRAINTS = [
+    ("cart_item", "uq_cart_item_user_id_course_id"),
+    ("review", "uq_review_course_id_user_id"),
+    ("wishlist", "wishlist_pkey"),
+    ("enrollment", "enrollment_pkey"),
+]
+
+# Each (user, course) pair is generated once; STRIDE is prime so pairs stay unique
+STRIDE = 7919
+PAIR = "g % {users} + 1, ((g / {users}) * " + str(STRIDE) + " + g % {users}) % {courses} + 1"
+
+def seed_statements(rows: int) -> list[str]:
+    users = max(100, rows // 10)
+    courses = max(10, rows // 100)
+    sections = courses * 10
+    pair = PAIR.format(users=users, courses=courses)
+    ago = "now() - make_interval(secs => (g * 37) % 31536000)"
+    return [
+        f"""INSERT INTO "user" (id, name, email, hashed_password, is_active, is_instructor, is_admin, created_at)
+            SELECT g, 'User ' || g, 'user' || g || '@bench.local', 'x', true, g % 100 = 0, false, {ago}
+            FROM generate_series(1, {users}) g""",
+        f"""INSERT INTO course (id, title, slug, description, short_description, price, category, level, instructor_id, created_at, updated_at)
+            SELECT g, 'Course ' || g, 'course-' || g, 'Description ' || g, 'Short ' || g, 499 + g % 1000,
+                   (ARRAY['Development', 'Design', 'Business', 'Marketing', 'Data Science'])[g % 5 + 1],
+                   (ARRAY['Beginner', 'Intermediate', 'Advanced'])[g % 3 + 1], (g % {users // 100} + 1) * 100, {ago}, {ago}
+            FROM generate_series(1, {courses}) g""",
+        f"""INSERT INTO section (id, course_id, title, "order", created_at)
+            SELECT g, (g - 1) / 10 + 1, 'Section ' || g, (g - 1) % 10 + 1, {ago}
+            FROM generate_series(1, {sections}) g""",
+        f"""INSERT INTO lecture (id, section_id, title, duration, "order", is_preview, created_at)
+            SELECT g, g % {sections} + 1, 'Lecture ' || g, '10:00', g / {sections} + 1, g % 20 = 0, {ago}
+            FROM generate_series(0, {rows - 1}) g""",
+        f"""INSERT INTO cart_item (id, user_id, course_id, added_at)
+            SELECT g + 1, {pair}, {ago} FROM generate_series(0, {rows - 1}) g""",
+        f"""INSERT INTO wishlist (user_id, course_id)
+            SELECT {pair} FROM generate_series(0, {rows - 1}) g""",
+        f"""INSERT INTO enrollment (user_id, course_id, enrolled_at)
+            SELECT {pair}, {ago} FROM generate_series(0, {rows - 1}) g""",
+        f"""INSERT INTO review (id, course_id, user_id, rating, comment, created_at)
+            SELECT g + 1, ((g / {users}) * {STRIDE} + g % {users}) % {courses} + 1, g % {users} + 1,
+                   g % 5 + 1, 'Review ' || g, {ago}
+            FROM generate_series(0, {rows - 1}) g""",
+        # Only recent manual payments are still waiting for verification
+        f"""INSERT INTO "order" (id, user_id, total_price, status, payment_method, created_at, updated_at)
+            SELECT g, g % {users} + 1, 499 + g % 1000,
+                   CASE WHEN g > {rows} - 5000 AND g % 5 = 0 THEN 'pending_verification' WHEN g % 12 = 0 THEN 'pending' ELSE 'completed' END,
+                   'upi', {ago}, {ago}
+            FROM generate_series(1, {rows}) g""",
+        f"""INSERT INTO order_item (id, order_id, course_id, price, created_at)
+            SELECT g, g, g % {courses} + 1, 499 + g % 1000, {ago}
+            FROM generate_series(1, {rows}) g""",
+        f"""INSERT INTO daily_class (id, course_id, title, topic, meet_link, scheduled_date, duration_minutes, is_active, created_at, updated_at)
+            SELECT g, g % {courses} + 1, 'Class ' || g, 'Topic', 'https://meet.example.com/' || g,
+                   now() + make_interval(days => g % 365 - 180), 60, g % 4 <> 0, {ago}, {ago}
+            FROM generate_series(1, {max(10, rows // 5)}) g""",
+    ]
+
+def router_queries(conn) -> list[tuple[str, str]]:
+    """(label, SQL) for each router query, with parameters picked from the loaded data"""
+    user_id = conn.execute(text("SELECT max(id) / 2 FROM \"user\"")).scalar()
+    course_id = conn.execute(text(f"SELECT course_id FROM cart_item WHERE user_id = {user_id} LIMIT 1")).scalar()
+    enrolled = conn.execute(text(f"SELECT course_id FROM enrollment WHERE user_id = {user_id}")).scalars().all()
+    order_ids = conn.execute(text(f'SELECT id FROM "order" WHERE user_id = {user_id} LIMIT 10')).scalars().all()
+    section_ids = conn.execute(text(f"SELECT id FROM section WHERE course_id = {course_id}")).scalars().all()
+
+    def ids(values):
+        return ", ".join(str(v) for v in values) or "0"
+
+    return [
+        ("GET /cart", f"SELECT * FROM cart_item WHERE user_id = {user_id}"),
+        ("POST /cart (duplicate check)", f"SELECT * FROM cart_item WHERE user_id = {user_id} AND course_id = {course_id}"),
+        ("GET /wishlist/check", f"SELECT 1 FROM wishlist WHERE user_id = {user_id} AND course_id = {course_id}"),
+        ("GET /daily-classes (enrollments)", f"SELECT course_id FROM enrollment WHERE user_id = {user_id}"),
+        ("GET /reviews?course_id",
+         f"SELECT * FROM review WHERE course_id = {course_id} ORDER BY created_at DESC, id DESC LIMIT 10"),
+        ("POST /reviews (existing review)", f"SELECT * FROM review WHERE course_id = {course_id} AND user_id = {user_id}"),
+        ("GET /orders", f'SELECT * FROM "order" WHERE user_id = {user_id} ORDER BY created_at DESC, id DESC LIMIT 10'),
+        ("GET /admin/orders", 'SELECT * FROM "order" ORDER BY created_at DESC LIMIT 100'),
+        ("GET /admin/orders?status=pending_verification",
+         "SELECT * FROM \"order\" WHERE status = 'pending_verification' ORDER BY created_at DESC"),
+        ("GET /orders (order items)", f"SELECT * FROM order_item WHERE order_id IN ({ids(order_ids)})"),
+        ("GET /courses/{id} (sections)", f'SELECT * FROM section WHERE course_id = {course_id} ORDER BY "order"'),
+        ("GET /courses/{id} (lectures)", f'SELECT * FROM lecture WHERE section_id IN ({ids(section_ids)}) ORDER BY section_id, "order"'),
+        ("GET /daily-classes/upcoming",
+         f"SELECT * FROM daily_class WHERE course_id IN ({ids(enrolled)}) AND is_active ORDER BY scheduled_date DESC LIMIT 20"),
+        ("GET /courses/{id}/daily-classes",
+         f"SELECT * FROM daily_class WHERE course_id = {course_id} AND is_active ORDER BY scheduled_date"),
+    ]
+
+def explain(conn, sql: str) -> tuple[dict, str]:
+    """Return (summary, text plan) for one query"""
+    plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]["Plan"]
+    scans = []
+    def walk(node):
+        if "Scan" in node["Node Type"]:
+            scans.append(node["Node Type"] + (f" ({node['Index Name']})" if "Index Name" in node else ""))
+        for child in node.get("Plans", []):
+            walk(child)
+    walk(root)
+    summary = {
+        "ms": plan[0]["Execution Time"],
+        "buffers": root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0),
+        "scans": ", ".join(scans),
+    }
+    text_plan = "\n".join(conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, COSTS OFF, TIMING OFF) {sql}")).scalars())
+    return summary, text_plan
+
+def run_all(conn, queries, show_plans: bool) -> list[dict]:
+    results = []
+    for label, sql in queries:
+        summary, text_plan = explain(conn, sql)
+        results.append(summary)
+        if show_plans:
+            print(f"\n--- {label}\n{text_plan}")
+    return results
+
+def drop_pack(conn) -> None:
+    for table, name in PACK_CONSTRAINTS:
+        conn.execute(text(f'ALTER TABLE "{table}" DROP CONSTRAINT {name}'))
+    for _, name in PACK_INDEXES:
+        conn.execute(text(f"DROP INDEX {name}"))
+
+def create_pack(conn) -> None:
+    names = {name for _, name in PACK_INDEXES}
+    constraint_names = {name for _, name in PACK_CONSTRAINTS}
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in names:
+                index.create(conn)
+        for constraint in table.constraints:
+            name = constraint.name or (f"{table.name}_pkey" if constraint is table.primary_key else None)
+            if name in constraint_names:
+                conn.execute(AddConstraint(constraint))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN router queries before/after the index pack")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows in each large table")
+    parser.add_argument("--schema", default="index_bench", help="scratch schema (dropped and recreated)")
+    parser.add_argument("--plans", action="store_true", help="print the full before/after plans")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema afterwards")
+    args = parser.parse_args()
+
+    if not settings.DATABASE_URL.startswith("postgresql"):
+        print("❌ bench_indexes.py needs a PostgreSQL DATABASE_URL")
+        raise SystemExit(1)
+
+    engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+    with engine.connect() as conn:
+        print(f"🔧 Building scratch schema '{args.schema}' with {args.rows:,} rows per large table...")
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {args.schema}"))
+        conn.execute(text(f"SET search_path TO {args.schema}"))
+        Base.metadata.create_all(conn)
+        drop_pack(conn)
+        for statement in seed_statements(args.rows):
+            conn.execute(text(statement))
+        conn.commit()
+        conn.execute(text("ANALYZE"))
+        queries = router_queries(conn)
+
+        print("\n📉 Before index pack")
+        before = run_all(conn, queries, args.plans)
+
+        print("\n🔧 Creating index pack...")
+        create_pack(conn)
+        conn.commit()
+        conn.execute(text("ANALYZE"))
+
+        print("\n📈 After index pack")
+        after = run_all(conn, queries, args.plans)
+
+        print(f"\n{'Query':<48} {'before ms':>10} {'after ms':>10} {'buffers':>17}  plan")
+        for (label, _), b, a in zip(queries, before, after):
+            print(f"{label:<48} {b['ms']:>10.2f} {a['ms']:>10.2f} {b['buffers']:>8} → {a['buffers']:<6}  {b['scans']} → {a['scans']}")
+
+        if not args.keep:
+            conn.execute(text(f"DROP SCHEMA {args.schema} CASCADE"))
+            conn.commit()
+    print("\n✅ Done")
@@ -0,0 +1,116 @@
+"""
+Compare ORM entities with CourseRow read models for course listings
+Run: python bench_read_models.py --rows 50000 --limit 100
+
+Loads synthetic courses (with long descriptions) into a scratch PostgreSQL
+schema (default ``read_model_bench``) of the configured DATABASE_URL, then
+serves the same listing pages two ways, through to the response body:
+
+- ORM: select(Course), validated into List[CourseResponse] and dumped
+- Rows: COURSES_PAGE (projected columns) read into CourseRow, same response
+
+Reports the time per page and the peak memory allocated while serving one.
+The scratch schema is dropped at the end unless --keep is given;
+application tables are not touched.
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import List
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from app.core.config import settings
+from app.db.read_models import course_rows
+from app.db.repository import COURSES_PAGE
+from app.models.models import Base, Course
+from app.schemas.schemas import CourseResponse
+
+LISTING = TypeAdapter(List[CourseResponse])
+
+ORM_PAGE = select(Course).where(Course.id > 0).order_by(Course.id)
+
+def seed_statements(rows: int) -> list[str]:
+    ago = "now() - make_interval(secs => (g * 37) % 31536000)"
+    return [
+        """INSERT INTO "user" (id, name, email, hashed_password, is_active, is_instructor, is_admin, created_at)
+           VALUES (1, 'Instructor', 'instructor@bench.local', 'x', true, true, false, now())""",
+        f"""
+        INSERT INTO course (id, title, slug, description, short_description, thumbnail, preview_video, price,
+                            original_price, duration, lecture_count, level, category, language, certificate,
+                            instructor_id, rating, review_count, enrolled_count, is_bestseller, is_trending,
+                            is_new, created_at, updated_at, last_updated)
+        SELECT g, 'Course ' || g, 'course-' || g, repeat('Long course description ' || g || '. ', 80),
+               'Short ' || g, 'https://cdn.example.com/' || g || '.jpg', 'https://cdn.example.com/' || g || '.mp4',
+               499 + g % 1000, 999 + g % 1000, (g % 60) || ' hours', g % 200,
+               (ARRAY['Beginner', 'Intermediate', 'Advanced'])[g % 3 + 1],
+               (ARRAY['Development', 'Design', 'Business', 'Marketing', 'Data Science'])[g % 5 + 1],
+               'English', true, 1, (g % 50) / 10.0, g % 500, g % 10000, g % 7 = 0, g % 11 = 0, g % 13 = 0,
+               {ago}, {ago}, {ago}
+        FROM generate_series(1, {rows}) g""",
+    ]
+
+def serve_orm(db: Session, skip: int, limit: int) -> bytes:
+    courses = db.scalars(ORM_PAGE.offset(skip).limit(limit)).all()
+    body = LISTING.dump_json(LISTING.validate_python(courses))
+    db.expunge_all()  # a request's session is closed afterwards; don't let the identity map grow
+    return body
+
+def serve_rows(db: Session, skip: int, limit: int) -> bytes:
+    courses = course_rows(db.execute(COURSES_PAGE, {"after_id": 0, "skip": skip, "limit": limit}))
+    return LISTING.dump_json(LISTING.validate_python(courses))
+
+def measure(serve, db: Session, rows: int, limit: int, pages: int) -> dict:
+    serve(db, 0, limit)  # warm the compiled cache and the validators
+    step = max(1, (rows - limit) // pages)
+    start = time.perf_counter()
+    for page in range(pages):
+        body = serve(db, page * step, limit)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    serve(db, 0, limit)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms": elapsed / pages * 1000, "peak_kb": peak / 1024, "bytes": len(body)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ORM entities vs CourseRow read models for listings")
+    parser.add_argument("--rows", type=int, default=50_000, help="courses to load")
+    parser.add_argument("--limit", type=int, default=100, help="courses per page")
+    parser.add_argument("--pages", type=int, default=200, help="pages served per variant")
+    parser.add_argument("--schema", default="read_model_bench", help="scratch schema (dropped and recreated)")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema afterwards")
+    args = parser.parse_args()
+
+    if not settings.DATABASE_URL.startswith("postgresql"):
+        print("❌ bench_read_models.py needs a PostgreSQL DATABASE_URL")
+        raise SystemExit(1)
+
+    engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+    with engine.connect() as conn:
+        print(f"🔧 Building scratch schema '{args.schema}' with {args.rows:,} courses...")
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {args.schema}"))
+        conn.execute(text(f"SET search_path TO {args.schema}"))
+        Base.metadata.create_all(conn)
+        for statement in seed_statements(args.rows):
+            conn.execute(text(statement))
+        conn.commit()
+        conn.execute(text("ANALYZE"))
+
+        print(f"\n⏱  Serving {args.pages} pages of {args.limit} courses each way...")
+        with Session(bind=conn) as db:
+            orm = measure(serve_orm, db, args.rows, args.limit, args.pages)
+            rows = measure(serve_rows, db, args.rows, args.limit, args.pages)
+
+        print(f"\n{'Variant':<12} {'ms/page':>10} {'peak KiB':>10} {'body bytes':>12}")
+        for label, result in (("ORM", orm), ("Rows", rows)):
+            print(f"{label:<12} {result['ms']:>10.2f} {result['peak_kb']:>10.0f} {result['bytes']:>12,}")
+        print(f"\n📈 {orm['ms'] / rows['ms']:.1f}x faster, {orm['peak_kb'] / rows['peak_kb']:.1f}x less peak memory")
+
+        if not args.keep:
+            conn.execute(text(f"DROP SCHEMA {args.schema} CASCADE"))
+            conn.commit()
+    print("\n✅ Done")
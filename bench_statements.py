@@ -0,0 +1,119 @@
+"""
+Microbenchmark: per-request query builder vs prebuilt statements
+Run: python bench_statements.py --iterations 5000
+
+For each hot lookup in app/db/repository.py this compares the old router
+code (building a Query on every call) with executing the prebuilt statement
+with bound parameters. Two numbers are reported per lookup:
+
+  build   - constructing the statement and computing its SQL cache key,
+            i.e. the Python work done before the compiled-SQL cache lookup
+  execute - process CPU time of a full session.execute() round trip against
+            DATABASE_URL (CPU time, so database latency is left out)
+"""
+
+import argparse
+import time
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+from app.db.database import engine
+from app.db import repository
+from app.models.models import User, Course, CartItem
+
+def legacy_cases(course_id, slug, category, user_id, email):
+    """label -> (build the statement, run it on a session), as the routers did before"""
+    return {
+        "Course by id": (
+            lambda db: db.query(Course).filter(Course.id == course_id).limit(1).statement,
+            lambda db: db.query(Course).filter(Course.id == course_id).first(),
+        ),
+        "Course by slug": (
+            lambda db: select(Course).where(Course.slug == slug),
+            lambda db: db.scalar(select(Course).where(Course.slug == slug)),
+        ),
+        "Courses by category": (
+            lambda db: select(Course).where(Course.category == category).offset(0).limit(100),
+            lambda db: db.scalars(select(Course).where(Course.category == category).offset(0).limit(100)).all(),
+        ),
+        "CartItem by user": (
+            lambda db: db.query(CartItem).filter(CartItem.user_id == user_id).statement,
+            lambda db: db.query(CartItem).filter(CartItem.user_id == user_id).all(),
+        ),
+        "User by email": (
+            lambda db: db.query(User).filter(User.email == email).limit(1).statement,
+            lambda db: db.query(User).filter(User.email == email).first(),
+        ),
+    }
+
+def prebuilt_cases(course_id, slug, category, user_id, email):
+    return {
+        "Course by id": (
+            lambda db: repository.COURSE_BY_ID,
+            lambda db: db.scalar(repository.COURSE_BY_ID, {"course_id": course_id}),
+        ),
+        "Course by slug": (
+            lambda db: repository.COURSE_BY_SLUG,
+            lambda db: db.scalar(repository.COURSE_BY_SLUG, {"slug": slug}),
+        ),
+        "Courses by category": (
+            lambda db: repository.COURSES_BY_CATEGORY,
+            lambda db: db.execute(repository.COURSES_BY_CATEGORY, {"category": category, "after_id": 0, "skip": 0, "limit": 100}).all(),
+        ),
+        "CartItem by user": (
+            lambda db: repository.CART_ITEMS_BY_USER,
+            lambda db: db.scalars(repository.CART_ITEMS_BY_USER, {"user_id": user_id}).all(),
+        ),
+        "User by email": (
+            lambda db: repository.USER_BY_EMAIL,
+            lambda db: db.scalar(repository.USER_BY_EMAIL, {"email": email}),
+        ),
+    }
+
+def per_call_us(fn, db, iterations: int, clock) -> float:
+    fn(db)  # warm the compiled cache
+    start = clock()
+    for _ in range(iterations):
+        fn(db)
+    return (clock() - start) / iterations * 1_000_000
+
+def build_cost(build):
+    # The cache key is what the engine computes before looking up compiled SQL
+    return lambda db: build(db)._generate_cache_key()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-request query building with prebuilt statements")
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    db = SessionLocal()
+
+    course = db.scalar(select(Course).limit(1))
+    user = db.scalar(select(User).limit(1))
+    params = (
+        course.id if course else 1,
+        course.slug if course else "missing",
+        course.category if course else "Development",
+        user.id if user else 1,
+        user.email if user else "missing@example.com",
+    )
+    legacy = legacy_cases(*params)
+    prebuilt = prebuilt_cases(*params)
+
+    print(f"🔧 Statement benchmark ({args.iterations} iterations, µs per call)\n")
+    print(f"{'Lookup':<22} {'build old':>10} {'build new':>10} {'exec CPU old':>13} {'exec CPU new':>13} {'saved':>8}")
+    for label in legacy:
+        old_build, old_run = legacy[label]
+        new_build, new_run = prebuilt[label]
+        results = [
+            per_call_us(build_cost(old_build), db, args.iterations, time.perf_counter),
+            per_call_us(build_cost(new_build), db, args.iterations, time.perf_counter),
+            per_call_us(old_run, db, args.iterations, time.process_time),
+            per_call_us(new_run, db, args.iterations, time.process_time),
+        ]
+        db.expunge_all()
+        saved = results[2] - results[3]
+        print(f"{label:<22} {results[0]:>10.1f} {results[1]:>10.1f} {results[2]:>13.1f} {results[3]:>13.1f} {saved:>8.1f}")
+
+    db.close()
+    print("\n✅ Done")
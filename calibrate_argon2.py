@@ -0,0 +1,71 @@
+"""
+Benchmark Argon2 parameters on this host and recommend settings
+Run: python calibrate_argon2.py --target-ms 100 --max-memory-mib 64
+
+Pick the memory budget per hash (concurrent logins x memory must fit in
+RAM on every worker) and the verify latency you can afford inside the
+login p99 budget. The script uses as much memory as the budget allows,
+then the highest time cost whose p95 verify time stays under the target.
+"""
+
+import argparse
+import os
+import statistics
+import time
+from argon2 import PasswordHasher
+
+SAMPLE_PASSWORD = "correct horse battery staple"
+MIN_MEMORY_KIB = 8 * 1024
+
+def measure(time_cost: int, memory_kib: int, parallelism: int, samples: int) -> tuple[float, float]:
+    """Return (p50, p95) verify latency in milliseconds"""
+    ph = PasswordHasher(time_cost=time_cost, memory_cost=memory_kib, parallelism=parallelism)
+    hashed = ph.hash(SAMPLE_PASSWORD)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        ph.verify(hashed, SAMPLE_PASSWORD)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))]
+    return statistics.median(timings), p95
+
+def calibrate(target_ms: float, max_memory_mib: int, parallelism: int, samples: int, max_time_cost: int):
+    memory_kib = max_memory_mib * 1024
+    while memory_kib >= MIN_MEMORY_KIB:
+        best = None
+        for time_cost in range(1, max_time_cost + 1):
+            p50, p95 = measure(time_cost, memory_kib, parallelism, samples)
+            print(f"   t={time_cost:<2} m={memory_kib // 1024:>4} MiB p={parallelism}  p50={p50:7.1f} ms  p95={p95:7.1f} ms")
+            if p95 > target_ms:
+                break
+            best = (time_cost, memory_kib, p50, p95)
+        if best:
+            return best
+        memory_kib //= 2
+    return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate Argon2 cost parameters for this host")
+    parser.add_argument("--target-ms", type=float, default=100.0, help="p95 verify latency budget in ms")
+    parser.add_argument("--max-memory-mib", type=int, default=64, help="memory budget per hash in MiB")
+    parser.add_argument("--parallelism", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--samples", type=int, default=7, help="verifications per candidate")
+    parser.add_argument("--max-time-cost", type=int, default=10)
+    args = parser.parse_args()
+
+    print("🔧 Argon2 calibration")
+    print(f"Target p95 verify: {args.target_ms} ms, memory budget: {args.max_memory_mib} MiB, parallelism: {args.parallelism}")
+    print()
+
+    result = calibrate(args.target_ms, args.max_memory_mib, args.parallelism, args.samples, args.max_time_cost)
+    if result is None:
+        print(f"\n❌ No parameters with at least {MIN_MEMORY_KIB // 1024} MiB meet the target. Raise --target-ms.")
+        raise SystemExit(1)
+
+    time_cost, memory_kib, p50, p95 = result
+    print(f"\n✅ Recommended (p50={p50:.1f} ms, p95={p95:.1f} ms). Add to .env:\n")
+    print(f"ARGON2_TIME_COST={time_cost}")
+    print(f"ARGON2_MEMORY_COST={memory_kib}")
+    print(f"ARGON2_PARALLELISM={args.parallelism}")
+    print("\nExisting hashes are upgraded on each user's next login.")
@@ -56,6 +56,6 @@ if __name__ == "__main__":
     
     if create_database():
         print("\n✅ Database setup complete!")
-        print("\nNow run: python seed_data.py")
+        print("\nNow run: python migrate.py && python seed_data.py")
     else:
         print("\n❌ Database setup failed!")
@@ -0,0 +1,55 @@
+"""
+Apply database schema migrations
+Run: python migrate.py            (apply all pending migrations)
+     python migrate.py status     (list applied and pending migrations)
+
+Migrations live in app/db/migrations. Run this once per deploy, before the
+new app version starts; the app itself no longer creates tables. Concurrent
+runs wait on an advisory lock, and index builds use CREATE INDEX
+CONCURRENTLY, so it is safe against a live database.
+"""
+
+import argparse
+import logging
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+from app.core.config import settings
+from app.db import migrator
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("command", nargs="?", choices=["upgrade", "status"], default="upgrade")
+    parser.add_argument("--target", type=int, help="stop after this migration version")
+    parser.add_argument("--lock-timeout-ms", type=int, default=5000,
+                        help="give up on a DDL lock after this long instead of blocking traffic")
+    parser.add_argument("--batch-pause", type=float, default=0.0,
+                        help="seconds to sleep between backfill batches")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+
+    if args.command == "status":
+        print("🔧 Migration status\n")
+        for migration, applied_at in migrator.status(engine):
+            state = f"✅ applied {applied_at:%Y-%m-%d %H:%M}" if applied_at else "⏳ pending"
+            print(f"  {migration.version:04d}_{migration.name:<24} {state}")
+        raise SystemExit(0)
+
+    print("🔧 Migrating database...")
+    try:
+        applied = migrator.upgrade(
+            engine,
+            target=args.target,
+            lock_timeout_ms=args.lock_timeout_ms,
+            batch_pause=args.batch_pause,
+        )
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        print("Fix the cause and run again; completed steps are skipped.")
+        raise SystemExit(1)
+
+    if applied:
+        print(f"\n✅ Applied {len(applied)} migration(s)")
+    else:
+        print("\n✅ Database is up to date")
@@ -26,6 +26,10 @@ REM Create database
 echo Setting up PostgreSQL database...
 python create_db.py > nul 2>&1
 
+REM Apply schema migrations
+echo Migrating database...
+python migrate.py
+
 REM Seed database
 echo Seeding database...
 python seed_data.py > nul 2>&1
@@ -6,7 +6,7 @@ Run: python seed_data.py
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
-from app.db.database import Base
+from app.db import migrator
 from app.models.models import User, Course, Section, Lecture
 from app.core.security import get_password_hash
 from datetime import datetime
@@ -23,8 +23,8 @@ def seed_database():
     """Seed database with initial data"""
     db = SessionLocal()
     
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    # Create or update tables
+    migrator.upgrade(engine)
     
     # Check if data already exists
     if db.query(User).count() > 0:
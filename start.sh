@@ -29,6 +29,10 @@ pip install -r requirements.txt > /dev/null 2>&1
 echo "🔍 Checking PostgreSQL connection..."
 python create_db.py > /dev/null 2>&1
 
+# Apply schema migrations
+echo "🔄 Migrating database..."
+python migrate.py
+
 # Seed database
 echo "🌱 Seeding database..."
 python seed_data.py > /dev/null 2>&1
@@ -0,0 +1,56 @@
+from contextlib import contextmanager
+import httpx
+import pytest
+from sqlalchemy.exc import OperationalError
+from app.db.database import async_engine, engine
+from app.db.instrumentation import count_queries, instrument_engines
+from app.main import app
+
+# Seeded by seed_data.py; an admin who is also an instructor
+ADMIN_LOGIN = {"email": "john@example.com", "password": "password123"}
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture(scope="session")
+def database():
+    """Skip tests that need the seeded PostgreSQL database when it is unreachable"""
+    try:
+        with engine.connect():
+            pass
+    except OperationalError as exc:
+        pytest.skip(f"Database unreachable: {exc.orig}")
+
+@pytest.fixture
+async def client():
+    """Client calling the app in the test's own context, so count_queries() sees its statements"""
+    instrument_engines()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    # Pooled asyncpg connections belong to this test's event loop
+    await async_engine.dispose()
+
+@pytest.fixture
+async def admin_headers(database, client):
+    response = await client.post("/api/v1/auth/login", json=ADMIN_LOGIN)
+    if response.status_code != 200:
+        pytest.skip(f"Seeded admin cannot log in ({response.status_code}); run seed_data.py")
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+@pytest.fixture
+def query_budget():
+    """Fail if the block runs more statements than its budget.
+
+        with query_budget(2):
+            response = await client.get("/api/v1/cart/", headers=admin_headers)
+    """
+    @contextmanager
+    def budget(max_queries: int):
+        with count_queries() as stats:
+            yield stats
+        assert stats.count <= max_queries, (
+            f"{stats.count} queries executed, budget is {max_queries}:\n"
+            + "\n".join(f"{n} x {shape}" for shape, n in stats.shapes.items())
+        )
+    return budget
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from app.db.database import AsyncSessionLocal, async_engine
+from app.services.catalog import CatalogFilters, browse
+from app.services.catalog_snapshot import CatalogSnapshot, load_catalog
+
+SORTS = ("popular", "rating", "newest", "price_asc", "price_desc")
+START = datetime(2026, 1, 1)
+
+def course(id: int, price: float, rating: float, enrolled: int, age_days: int, category: str = "Development"):
+    created = START - timedelta(days=age_days)
+    return SimpleNamespace(
+        id=id, title=f"Course {id}", slug=f"course-{id}", description="", short_description="", thumbnail="",
+        price=price, original_price=None, duration="1 hour", lecture_count=1, level="Beginner",
+        category=category, language="English", instructor_id=1, rating=rating, review_count=0,
+        enrolled_count=enrolled, is_bestseller=False, is_trending=False, is_new=False,
+        created_at=created, updated_at=created,
+    )
+
+# Ties on every sort key, so the tie-breaks are exercised too
+ROWS = [
+    course(1, 499, 4.5, 100, 3),
+    course(2, 999, 4.5, 300, 1),
+    course(3, 499, 3.0, 100, 1, category="Design"),
+    course(4, 199, 5.0, 0, 7),
+    course(5, 999, 4.0, 300, 3, category="Design"),
+]
+
+# The ORDER BY of app.services.catalog._order_by, applied in Python
+SQL_ORDER = {
+    "popular": lambda row: (-row.enrolled_count, row.id),
+    "rating": lambda row: (-row.rating, row.id),
+    "newest": lambda row: (-row.created_at.timestamp(), -row.id),
+    "price_asc": lambda row: (row.price, row.id),
+    "price_desc": lambda row: (-row.price, row.id),
+}
+
+@pytest.mark.parametrize("sort", SORTS)
+def test_snapshot_orders_like_sql(sort):
+    snapshot = CatalogSnapshot(ROWS)
+    expected = [row.id for row in sorted(ROWS, key=SQL_ORDER[sort])]
+    result = snapshot.browse(CatalogFilters(), sort, 0, len(ROWS))
+    assert [item.id for item in result["items"]] == expected
+    # Pages cut through ties at the same places as OFFSET / LIMIT
+    pages = [item.id for skip in range(0, len(ROWS), 2) for item in snapshot.browse(CatalogFilters(), sort, skip, 2)["items"]]
+    assert pages == expected
+
+def test_snapshot_filters_and_counts_facets():
+    result = CatalogSnapshot(ROWS).browse(CatalogFilters(category=("Design",), max_price=600), "popular", 0, 10)
+    assert [item.id for item in result["items"]] == [3]
+    assert result["total"] == 1
+    # A facet's counts ignore its own selection
+    assert result["facets"]["category"] == [{"value": "Development", "count": 2}, {"value": "Design", "count": 1}]
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("sort", SORTS)
+async def test_snapshot_matches_sql_on_the_database(database, sort):
+    snapshot = CatalogSnapshot(await load_catalog())
+    filters = CatalogFilters()
+    async with AsyncSessionLocal() as db:
+        expected = await browse(db, filters, sort, 0, 100)
+    await async_engine.dispose()
+    result = snapshot.browse(filters, sort, 0, 100)
+    assert [item.id for item in result["items"]] == [item.id for item in expected["items"]]
+    assert result["total"] == expected["total"]
+    assert result["facets"] == expected["facets"]
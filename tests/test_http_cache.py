@@ -0,0 +1,53 @@
+from datetime import datetime
+from fastapi import Request, Response
+from app.core.http_cache import PRIVATE_CACHE_CONTROL, conditional_response, latest, weak_etag
+from app.core.negotiation import response_format
+
+MODIFIED = datetime(2026, 5, 6, 7, 8, 9, 500000)
+HTTP_DATE = "Wed, 06 May 2026 07:08:09 GMT"
+
+def request(**headers: str) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+def test_weak_etag_is_stable_and_per_format():
+    tag = weak_etag("course", 1, MODIFIED)
+    assert tag.startswith('W/"') and tag == weak_etag("course", 1, MODIFIED)
+    assert tag != weak_etag("course", 2, MODIFIED)
+    token = response_format.set("msgpack")
+    try:
+        assert weak_etag("course", 1, MODIFIED) != tag
+    finally:
+        response_format.reset(token)
+
+def test_latest_ignores_missing_stamps():
+    assert latest(None, MODIFIED, datetime(2020, 1, 1)) == MODIFIED
+    assert latest(None, None) is None
+
+def test_sets_validators_and_returns_none_without_conditions():
+    response = Response()
+    assert conditional_response(request(), response, 'W/"a"', MODIFIED, private=True) is None
+    assert response.headers["etag"] == 'W/"a"'
+    assert response.headers["last-modified"] == HTTP_DATE
+    assert response.headers["cache-control"] == PRIVATE_CACHE_CONTROL
+
+def test_if_none_match_uses_weak_comparison():
+    not_modified = conditional_response(request(if_none_match='"b", "a"'), Response(), 'W/"a"')
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == 'W/"a"'
+    assert conditional_response(request(if_none_match='W/"b"'), Response(), 'W/"a"') is None
+
+def test_if_modified_since_has_whole_second_precision():
+    assert conditional_response(request(if_modified_since=HTTP_DATE), Response(), 'W/"a"', MODIFIED).status_code == 304
+    earlier = "Wed, 06 May 2026 07:08:08 GMT"
+    assert conditional_response(request(if_modified_since=earlier), Response(), 'W/"a"', MODIFIED) is None
+
+def test_if_none_match_takes_precedence():
+    headers = {"if_none_match": 'W/"b"', "if_modified_since": HTTP_DATE}
+    assert conditional_response(request(**headers), Response(), 'W/"a"', MODIFIED) is None
+
+def test_collections_ignore_if_modified_since():
+    # No ``modified`` for collections: a deletion would not move it
+    response = Response()
+    assert conditional_response(request(if_modified_since=HTTP_DATE), response, 'W/"a"') is None
+    assert "last-modified" not in response.headers
@@ -0,0 +1,72 @@
+from datetime import datetime
+import httpx
+import msgpack
+import pytest
+from fastapi import APIRouter, FastAPI
+from pydantic import BaseModel
+from app.core import negotiation
+from app.core.negotiation import MSGPACK_MEDIA_TYPE, MessagePackMiddleware, NegotiatedRoute, negotiate
+
+class Item(BaseModel):
+    id: int
+    created_at: datetime
+
+ITEM = Item(id=1, created_at=datetime(2026, 1, 2, 3, 4, 5))
+
+def make_app() -> FastAPI:
+    router = APIRouter(prefix="/items", route_class=NegotiatedRoute)
+
+    @router.get("/{item_id}", response_model=Item)
+    async def get_item(item_id: int):
+        return ITEM
+
+    @router.get("/{item_id}/raw")
+    async def get_raw(item_id: int):
+        return {"id": item_id}
+
+    app = FastAPI()
+    app.add_middleware(MessagePackMiddleware)
+    app.include_router(router, prefix="/api")
+    return app
+
+@pytest.mark.parametrize("accept, expected", [
+    ("", "json"),
+    ("*/*", "json"),
+    ("application/msgpack", "msgpack"),
+    ("application/x-msgpack", "msgpack"),
+    ("application/json, application/msgpack", "msgpack"),  # a tie goes to MessagePack
+    ("application/json, application/msgpack;q=0.5", "json"),
+    ("application/msgpack;q=0, */*", "json"),
+    ("application/msgpack;q=0.9, application/*;q=0.5", "msgpack"),
+    ("application/msgpack;q=oops", "json"),
+])
+def test_negotiate(accept, expected):
+    assert negotiate(accept) == expected
+
+async def get(app: FastAPI, url: str, accept: str) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get(url, headers={"Accept": accept})
+
+@pytest.mark.anyio
+async def test_included_route_packs_its_response_model(monkeypatch):
+    # Fails if the route hook stops working (e.g. after a FastAPI upgrade) and
+    # model responses silently fall back to JSON plus transcoding
+    def no_transcoding(body):
+        raise AssertionError("response model was transcoded from JSON")
+    monkeypatch.setattr(negotiation, "_transcode", no_transcoding)
+    response = await get(make_app(), "/api/items/1", MSGPACK_MEDIA_TYPE)
+    assert response.headers["content-type"] == MSGPACK_MEDIA_TYPE
+    assert msgpack.unpackb(response.content) == ITEM.model_dump(mode="json")
+    assert "accept" in response.headers["vary"].lower()
+
+@pytest.mark.anyio
+async def test_json_stays_json():
+    response = await get(make_app(), "/api/items/1", "application/json")
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == ITEM.model_dump(mode="json")
+
+@pytest.mark.anyio
+async def test_bodies_without_a_model_are_transcoded():
+    response = await get(make_app(), "/api/items/7/raw", MSGPACK_MEDIA_TYPE)
+    assert response.headers["content-type"] == MSGPACK_MEDIA_TYPE
+    assert msgpack.unpackb(response.content) == {"id": 7}
@@ -0,0 +1,16 @@
+from datetime import datetime
+import pytest
+from fastapi import HTTPException
+from app.core.pagination import decode_cursor, encode_cursor
+
+def test_cursor_round_trip():
+    stamp = datetime(2026, 3, 4, 5, 6, 7, 890)
+    cursor = encode_cursor(stamp, 0.25, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, datetime, float, int) == (stamp, 0.25, 42)
+
+@pytest.mark.parametrize("cursor", ["not base64!", encode_cursor(1), encode_cursor("x", 2), "e30"])
+def test_malformed_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, int, int)
+    assert error.value.status_code == 400
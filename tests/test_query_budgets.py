@@ -0,0 +1,22 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+async def assert_within_budget(client, query_budget, url: str, headers: dict, max_queries: int):
+    # The first request also pulls token revocations; budget the steady state
+    await client.get(url, headers=headers)
+    with query_budget(max_queries):
+        response = await client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+
+async def test_admin_daily_classes(client, admin_headers, query_budget):
+    # Course titles come from the same join, not one query per class
+    await assert_within_budget(client, query_budget, "/api/v1/admin/daily-classes", admin_headers, 1)
+
+async def test_upcoming_daily_classes(client, admin_headers, query_budget):
+    # Enrolled course ids, then the classes joined with their course titles
+    await assert_within_budget(client, query_budget, "/api/v1/daily-classes/upcoming", admin_headers, 2)
+
+async def test_cart(client, admin_headers, query_budget):
+    # Validators, then items with their courses and instructors eagerly loaded
+    await assert_within_budget(client, query_budget, "/api/v1/cart/", admin_headers, 4)
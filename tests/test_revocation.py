@@ -0,0 +1,70 @@
+import threading
+from datetime import datetime, timedelta
+from app.core.revocation import BloomFilter, TokenRevocationList
+
+class FakeQuery:
+    def __init__(self, db):
+        self.db = db
+
+    def filter(self, *criteria):
+        return self
+
+    def all(self):
+        self.db.reading.set()
+        self.db.proceed.wait(timeout=5)
+        return list(self.db.rows)
+
+class FakeSession:
+    """Stands in for the revoked_token table; ``all()`` can be held open to interleave a revoke"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.reading = threading.Event()
+        self.proceed = threading.Event()
+        self.proceed.set()
+
+    def query(self, *columns):
+        return FakeQuery(self)
+
+    def merge(self, row):
+        self.rows.append((row.jti, datetime.utcnow()))
+
+    def commit(self):
+        pass
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"jti-{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+    assert all(item in bloom for item in items)
+    assert bloom.count == 1000
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300  # about 1% expected
+
+def test_overlapping_syncs_count_each_jti_once():
+    revoked_at = datetime.utcnow()
+    db = FakeSession([("a", revoked_at), ("b", revoked_at)])
+    revocations = TokenRevocationList(capacity=100, error_rate=0.01, sync_seconds=0)
+    for _ in range(5):
+        revocations._sync(db)
+    assert revocations._bloom.count == 2
+
+def test_revoke_during_rebuild_reaches_the_new_filter():
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    db = FakeSession([("old", datetime.utcnow())])
+    revocations = TokenRevocationList(capacity=100, error_rate=0.01, sync_seconds=0)
+    db.proceed.clear()
+    rebuild = threading.Thread(target=revocations._sync, args=(db,))
+    rebuild.start()
+    assert db.reading.wait(timeout=5)
+    # The rebuild has read the table; revoke a token before it installs its filter
+    revoker = threading.Thread(target=revocations.revoke, args=(FakeSession(), "new", 1, expires_at))
+    revoker.start()
+    db.proceed.set()
+    rebuild.join(timeout=5)
+    revoker.join(timeout=5)
+    assert "old" in revocations._bloom
+    assert "new" in revocations._bloom
+    revocations._sync(db)
+    assert "new" in revocations._bloom
@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+from app.services.suggest import Suggestion, SuggestIndex, edit_distance, tokenize
+
+COURSES = [
+    Suggestion(1, "Python for Beginners", "python-for-beginners", "Development", 100),
+    Suggestion(2, "Advanced Python", "advanced-python", "Development", 5000),
+    Suggestion(3, "Café Photography", "cafe-photography", "Design", 10),
+    Suggestion(4, "Marketing Basics", "marketing-basics", "Business", 50),
+]
+
+def make_index() -> SuggestIndex:
+    index = SuggestIndex()
+    index.rebuild(COURSES)
+    return index
+
+def ids(results) -> list[int]:
+    return [entry.id for entry in results]
+
+def test_tokenize_folds_case_and_accents():
+    assert tokenize("Café  Photography!") == ["cafe", "photography"]
+
+def test_edit_distance_counts_a_transposition_once():
+    assert edit_distance("pyhton", "python", 2) == 1
+    assert edit_distance("abc", "xyz", 1) == 2  # capped at limit + 1
+
+def test_last_word_matches_as_a_prefix_and_popular_courses_rank_first():
+    assert ids(make_index().suggest("pyt")) == [2, 1]
+
+def test_every_word_has_to_match():
+    assert ids(make_index().suggest("python beg")) == [1]
+    assert make_index().suggest("python photo") == []
+
+def test_typos_are_tolerated():
+    assert ids(make_index().suggest("markting")) == [4]
+
+def test_category_matches_rank_below_title_matches():
+    index = make_index()
+    index.upsert(SimpleNamespace(id=5, title="Design Systems", slug="design-systems", category="Design", enrolled_count=0))
+    assert ids(index.suggest("design"))[0] == 5
+
+def test_writes_replace_cached_results():
+    index = make_index()
+    assert ids(index.suggest("pyt")) == [2, 1]
+    index.remove(2)
+    assert ids(index.suggest("pyt")) == [1]